@@ -0,0 +1,78 @@
+"""
+Introduction:
+This script times the annual battery dispatch of the solar study: one
+home's cost-minimizing battery schedule over a full year at 15-minute
+steps (35,040 steps). The net demand is synthetic (a daily demand cycle
+with noise minus a clear-sky solar supply), so no data files are needed.
+The year is solved at once, then with each requested rolling horizon.
+
+The script exits with status 1 if any solve takes longer than the target.
+
+Usage (from the repository root):
+    python benchmarks/annualDispatch.py
+    python benchmarks/annualDispatch.py --horizons 192 672 --target 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# repository root, one level above this file
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ders
+
+
+def net_demand(dt, rng):
+    """
+    netDemand generates a year of synthetic net demand, kW, and the time
+    of day of each step, h.
+    """
+    t = np.arange(0, 8760, dt)  # time, h
+    hour = t % 24  # time of day, h
+    day = t // 24  # day of year
+    demand = 1 + 0.8 * np.exp(-((hour - 19) / 3) ** 2) + 0.3 * rng.standard_normal(len(t))  # kW
+    season = 1 + 0.4 * np.cos(2 * np.pi * (day - 172) / 365)  # longer, stronger sun in summer
+    solar = 6 * season * np.maximum(np.cos(np.pi * (hour - 12.5) / (12 * season)), 0)  # kW
+    return np.maximum(demand, 0) - solar, hour
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the annual battery dispatch.')
+    parser.add_argument('--horizons', nargs='*', type=int, default=[192, 672],
+                        help='rolling-horizon window lengths, steps (the full year is always solved)')
+    parser.add_argument('--target', type=float, default=10.0, help='maximum time per annual solve, s')
+    parser.add_argument('--output', default=None, help='optional JSON file for the results')
+    args = parser.parse_args(argv)
+
+    dt = 0.25  # time step, h
+    p_net, hour = net_demand(dt, np.random.default_rng(0))
+    pi_buy = np.where((hour >= 16) & (hour < 21), 0.30, 0.12)  # TOU price, $/kWh
+    pi_sell = 0.03  # export credit, $/kWh
+    base = np.sum(pi_buy * np.maximum(p_net, 0) - pi_sell * np.maximum(-p_net, 0)) * dt  # cost without battery, $
+
+    results = []
+    failed = False
+    print(f'{len(p_net)} steps, cost without battery ${base:.0f}')
+    for horizon in [None] + args.horizons:
+        start = time.perf_counter()
+        x, p_batt, cost = ders.battery_dispatch(p_net, dt, pi_buy, pi_sell, 13.5, 5, horizon=horizon)
+        elapsed = time.perf_counter() - start
+        failed = failed or elapsed > args.target
+        label = 'full year' if horizon is None else f'horizon {horizon}'
+        results.append({'horizon': horizon, 'time': elapsed, 'cost': cost})
+        print(f'{label:20s} {elapsed:8.2f} s  cost ${cost:.0f}  {"ok" if elapsed <= args.target else "slow"}')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'target': args.target, 'base_cost': base, 'results': results}, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# repository root, one level above this file
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ders
+
+# simulation time step of every benchmark, h
+DT = 1 / 60
+
+
+# ==============================================================================
+# fixtures
+# ==============================================================================
+
+def building_fixture(K, N, rng):
+    """
+    buildingFixture generates synthetic 2R2C inputs for N 200 m^2, two-story
+    homes: a daily outdoor temperature cycle with noise, and a night setback.
+    """
+    discretize_2r2c = ders.discretize_2r2c
+    Af, n = 200, 2  # floor area (m^2) and number of stories
+    C = 0.0125 * Af
+    R = 1 / (0.016 * np.sqrt(n * Af))
+    A, B = discretize_2r2c(R, C, R / 6, 12 * C, DT)
+    t = np.arange(K + 1) * DT  # time span, h
+    Tout = 5 * np.sin(2 * np.pi * t[:K] / 24) + rng.normal(0, 1, (N, K))  # outdoor temperature, C
+    w = Tout / R + 1  # disturbance, kW
+    Tset = np.where((t % 24 < 6) | (t % 24 > 22), 18.5, 21.0)  # setpoint, C
+    return {'A': A, 'B': B, 'w': w, 'T0': np.array([Tset[0], np.mean(Tset)]), 'Tset': Tset,
+            'qcMin': np.zeros(K), 'qcMax': np.full(K, 14.0)}
+
+
+def mfred_fixture(directory):
+    """
+    mfredFixture writes a synthetic MFRED csv (2019, 15-minute, 26 groups)
+    into the given directory and returns its file name. The file has the
+    same layout as the real data set: a UTC timestamp, three aggregate
+    columns, and kW, kVA and kVAR columns per apartment group.
+    """
+    file_name = os.path.join(directory, 'MFRED-synthetic.csv')
+    if os.path.exists(file_name):
+        return file_name
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(0)
+    t = pd.date_range('2019-01-01', '2020-01-01 05:00', freq='15min')
+    columns = {'Timestamp': t.strftime('%m/%d/%y %H:%M'), 'kW': 0.0, 'kVA': 0.0, 'kVAR': 0.0}
+    for i in range(26):
+        columns[f'AG{i + 1}_kW'] = np.round(rng.gamma(2, 0.25, len(t)), 3)
+        columns[f'AG{i + 1}_kVA'] = 0.0
+        columns[f'AG{i + 1}_kVAR'] = 0.0
+    pd.DataFrame(columns).to_csv(file_name, index=False)
+    return file_name
+
+
+# ==============================================================================
+# kernels
+# ==============================================================================
+# Each benchmark takes the number of time steps K, the number of devices N
+# and a random generator. It does its setup and returns a zero-argument
+# callable that runs the kernel once. fleet=True marks kernels that simulate
+# N devices in one call; the others are run for a single device.
+
+def bench_thermostatic_control(K, N, rng):
+    thermostatic_control = ders.thermostatic_control
+    f = building_fixture(K, 1, rng)
+    return lambda: thermostatic_control(f['A'], f['B'], f['w'][0], f['T0'], f['Tset'], f['qcMin'], f['qcMax'], 0.5)
+
+
+def bench_fleet_control(K, N, rng):
+    fleet_control = ders.fleet_control
+    f = building_fixture(K, N, rng)
+    return lambda: fleet_control(f['A'], f['B'], f['w'], f['T0'], f['Tset'], f['qcMin'], f['qcMax'], 0.5)
+
+
+def bench_generate_electricity_demand(K, N, rng):
+    generate_electricity_demand = ders.generate_electricity_demand
+    file_name = mfred_fixture(os.path.join(tempfile.gettempdir(), 'ders-benchmarks'))
+    t_span = pd.date_range('2022-01-01', periods=K, freq='1min')
+    day = np.arange(K) * DT / 24
+    theta = 10 - 15 * np.cos(2 * np.pi * day / 365) + 5 * np.sin(2 * np.pi * day)  # outdoor temperature, C
+    total_horizontal = np.maximum(0, np.sin(2 * np.pi * (day - 0.25)))  # horizontal irradiance, kW/m^2
+    groups = None if N == 1 else np.arange(N) % 26  # MFRED profile of each building
+    return lambda: generate_electricity_demand(t_span, file_name, 200, 2, theta, total_horizontal, 0, groups)
+
+
+def bench_solar_angles(K, N, rng):
+    solar_angles, solar_angles_cache_clear = ders.solar_angles, ders.solar_angles_cache_clear
+    t_span = np.datetime64('2022-01-01') + np.arange(K) * np.timedelta64(1, 'm')
+    lat = rng.uniform(25, 48, N)  # latitudes of N rooftops, degrees
+    long = rng.uniform(-124, -67, N)  # longitudes, degrees
+
+    def run():
+        solar_angles_cache_clear()  # time the computation, not the cache
+        return solar_angles(lat, long, t_span, -5)
+    return run
+
+
+def bench_surface_irradiance(K, N, rng):
+    solar_angles, surface_irradiance = ders.solar_angles, ders.surface_irradiance
+    t_span = np.datetime64('2022-01-01') + np.arange(K) * np.timedelta64(1, 'm')
+    el, az = solar_angles(40.4259, -86.9081, t_span, -5)
+    beam_normal = np.where(el > 0, 0.8, 0)  # kW/m^2
+    diffuse_horizontal = np.where(el > 0, 0.1, 0)  # kW/m^2
+    az0 = rng.uniform(-90, 90, N)  # surface azimuths of N orientations, degrees
+    tilt = rng.uniform(0, 60, N)  # surface tilts, degrees
+    return lambda: surface_irradiance(az, el, az0, tilt, beam_normal, diffuse_horizontal)
+
+
+def bench_tariff_bills(K, N, rng):
+    tou_periods, tariff_bills = ders.tou_periods, ders.tariff_bills
+    t_span = np.datetime64('2022-01-01') + np.arange(K) * np.timedelta64(1, 'm')
+    periods = tou_periods(t_span, [(16, 21)])  # 4-9 pm weekday peak
+    p = rng.normal(0.5, 2, (N, K))  # net demand of N customers, kW
+    return lambda: tariff_bills(p, t_span, DT, periods, [0.10, 0.30], 0.03, [500], [0, 0.05], [2, 10], 10)
+
+
+def bench_generate_driving_power(K, N, rng):
+    generate_driving_power = ders.generate_driving_power
+    t = np.arange(K + 1) * DT
+    alpha = 0.3 * np.ones(K)
+    return lambda: generate_driving_power(t, alpha, N, rng)
+
+
+def bench_simulate_fleet_policy3(K, N, rng):
+    simulate_fleet_policy3 = ders.simulate_fleet_policy3
+    t = np.arange(K + 1) * DT
+    h = np.mod(t[:K], 24)  # hour of day
+    p_chem_drive = np.where(rng.random((N, K)) < 0.05, 10, 0).astype(np.float32)  # driving power, kW
+    z = ((h < 7) | (h > 18)) & (p_chem_drive == 0)  # plugged in overnight
+    x_max = rng.choice([60., 80.], N)  # battery capacities, kWh
+    return lambda: simulate_fleet_policy3(0.5 * x_max, z, p_chem_drive, np.exp(-DT / 1600), 1600, 0.95, 0.95,
+                                          rng.choice([7.2, 11.5], N), x_max, 0.3 * x_max, t, 7, 0.9 * x_max,
+                                          aggregate=True)
+
+
+def bench_fleet_aggregator(K, N, rng):
+    FleetAggregator = ders.FleetAggregator
+    p = np.where(rng.random((N, K)) < 0.3, rng.choice([7.2, 11.5], (N, 1)), 0)  # charging powers, kW
+
+    def run():
+        aggregator = FleetAggregator(K, 12)
+        aggregator.push(p)
+        return aggregator.quantile([0.5, 0.95]), aggregator.peaks(10, 60)
+    return run
+
+
+def bench_generate_water_draws(K, N, rng):
+    generate_water_draws = ders.generate_water_draws
+    t = np.arange(K + 1) * DT
+    return lambda: generate_water_draws(t, 4)
+
+
+def bench_water_heater_control(K, N, rng):
+    water_heater_control = ders.water_heater_control
+    get_water_heater_parameters = ders.get_water_heater_parameters
+    R, C = get_water_heater_parameters(0.19, 0.0005)
+    x_max = C * (52 - 15)
+    alpha = 1 / (R * C)
+    qd = np.zeros(K)
+    qd[rng.random(K) < 0.01] = 18  # thermal power draws, kW
+    w = (20 - 15) / R - qd
+    return lambda: water_heater_control(x_max, x_max, 0.5, 4.5, np.exp(-alpha * DT), w, 3 * np.ones(K), alpha, x_max / 2)
+
+
+def bench_nonlinear_climate_sim(K, N, rng):
+    nonlinear_climate_sim = ders.nonlinear_climate_sim
+    t = np.arange(K + 1) * DT * 3600  # time span, s
+    u = 0.767 + 1e-6 * np.arange(K)  # atmospheric emissivity
+    wt = np.full(K, 2.3e-6)  # continuous-time disturbance, K/s
+    return lambda: nonlinear_climate_sim(t, 288.0, u, wt, 3.2e-16)
+
+
+# name -> (benchmark, fleet)
+KERNELS = {
+    'thermostatic_control': (bench_thermostatic_control, False),
+    'fleet_control': (bench_fleet_control, True),
+    'generate_electricity_demand': (bench_generate_electricity_demand, True),
+    'solar_angles': (bench_solar_angles, True),
+    'surface_irradiance': (bench_surface_irradiance, True),
+    'tariff_bills': (bench_tariff_bills, True),
+    'generate_driving_power': (bench_generate_driving_power, True),
+    'simulate_fleet_policy3': (bench_simulate_fleet_policy3, True),
+    'fleet_aggregator': (bench_fleet_aggregator, True),
+    'generate_water_draws': (bench_generate_water_draws, False),
+    'water_heater_control': (bench_water_heater_control, False),
+    'nonlinear_climate_sim': (bench_nonlinear_climate_sim, False),
+}
+
+# kernels that are still student exercises: they may fail to import or
+# return no result, and are then reported as unavailable
+STUBS = {'thermostatic_control', 'water_heater_control', 'nonlinear_climate_sim'}
@@ -0,0 +1,97 @@
+"""
+Introduction:
+This script measures the cold-import time of the ders package and of each
+kernel it exposes. Every measurement runs in a fresh Python process, so
+nothing is already cached in sys.modules. The script also records whether
+matplotlib or pandas were loaded along the way: no kernel should import
+matplotlib, and pandas should be imported only once a CSV loader is
+actually called.
+
+A kernel fails the check if it loads matplotlib or pandas, or if its cold
+import takes longer than the target. Kernels that are still student
+exercises (they do not import yet) are reported as unavailable. The script
+exits with status 1 if any kernel fails.
+
+Usage (from the repository root):
+    python benchmarks/importTime.py
+    python benchmarks/importTime.py --target 0.5 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# repository root, one level above this file
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ders
+
+# code run in each fresh process: import the package, then one kernel
+CHILD = '''
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import ders
+status = 'ok'
+if {name!r}:
+    try:
+        getattr(ders, {name!r})
+    except (SyntaxError, ImportError) as error:
+        status = 'unavailable'
+elapsed = time.perf_counter() - start
+print(json.dumps({{'status': status, 'import_time': elapsed,
+                  'matplotlib': 'matplotlib' in sys.modules, 'pandas': 'pandas' in sys.modules}}))
+'''
+
+
+def cold_import(name, repeat):
+    """
+    coldImport imports ders (and, if name is not empty, one of its kernels)
+    in fresh processes and returns the fastest import time with the
+    modules it loaded.
+    """
+    records = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', CHILD.format(root=ROOT, name=name)],
+                             capture_output=True, text=True, check=True).stdout
+        records.append(json.loads(out))
+    return min(records, key=lambda r: r['import_time'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold-import times of the ders kernels.')
+    parser.add_argument('--kernels', nargs='+', choices=sorted(ders.KERNELS), default=sorted(ders.KERNELS))
+    parser.add_argument('--target', type=float, default=1.0, help='maximum cold-import time per kernel, s')
+    parser.add_argument('--repeat', type=int, default=3, help='fresh processes per kernel (fastest is kept)')
+    parser.add_argument('--output', default=None, help='optional JSON file for the results')
+    args = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for name in [''] + args.kernels:
+        record = {'kernel': name or '(package)', **cold_import(name, args.repeat)}
+        problems = []
+        if record['status'] == 'ok':
+            if record['matplotlib']:
+                problems.append('imports matplotlib')
+            if record['pandas']:
+                problems.append('imports pandas')
+            if record['import_time'] > args.target:
+                problems.append(f'slower than {args.target} s')
+        record['problems'] = problems
+        failed = failed or bool(problems)
+        results.append(record)
+        note = 'unavailable' if record['status'] != 'ok' else ('; '.join(problems) or 'ok')
+        print(f"{record['kernel']:30s} {record['import_time']:8.3f} s  {note}")
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'target': args.target, 'results': results}, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
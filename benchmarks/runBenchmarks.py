@@ -0,0 +1,159 @@
+"""
+Introduction:
+This script benchmarks the simulation kernels in this repository as the
+horizon K and the number of devices N grow. Every kernel runs on synthetic
+inputs, so no data files are needed. Wall time, steps per second
+(K*N/time) and peak traced memory are written to a JSON file. Each run is
+then compared against a stored baseline, and any kernel that slowed down
+by more than the tolerance is flagged.
+
+Kernels that are still student exercises (STUBS in benchmarkKernels) are
+recorded as unavailable when they do not import or do not return results
+yet. Any other error, or any error in a kernel that is not a stub, is
+recorded as an error and fails the run.
+
+Usage (from the repository root):
+    python benchmarks/runBenchmarks.py                      # default sweep
+    python benchmarks/runBenchmarks.py --quick              # small sweep
+    python benchmarks/runBenchmarks.py --save-baseline      # store a new baseline
+    python benchmarks/runBenchmarks.py --kernels fleet_control --N 1 100 10000
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarkKernels import KERNELS, STUBS
+
+# horizons at 1-minute resolution
+HORIZONS = {'week': 7 * 1440, 'month': 30 * 1440, 'quarter': 91 * 1440, 'year': 365 * 1440}
+
+# fleet sizes for kernels that simulate many devices at once, over one day
+FLEET_SIZES = [1, 10, 100, 1000, 10000]
+FLEET_HORIZON = 1440
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_case(name, K, N, repeat, memory):
+    """
+    runCase times one kernel at one (K, N) and returns its result record.
+    """
+    bench, _ = KERNELS[name]
+    record = {'kernel': name, 'K': K, 'N': N}
+    try:
+        rng = np.random.default_rng(0)
+        call = bench(K, N, rng)
+
+        # wall time, best of repeat runs
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            out = call()
+            times.append(time.perf_counter() - start)
+        if out is None:
+            raise NotImplementedError('kernel returned no result')
+
+        # peak memory in a separate traced run, since tracing slows Python loops
+        peak = None
+        if memory:
+            tracemalloc.start()
+            call()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+
+        record.update(status='ok', wall_time=min(times), steps_per_second=K * N / min(times), peak_memory_mb=peak)
+    except (SyntaxError, ImportError, NotImplementedError) as error:
+        status = 'unavailable' if name in STUBS else 'error'
+        record.update(status=status, error=f'{type(error).__name__}: {error}')
+    except Exception as error:
+        record.update(status='error', error=f'{type(error).__name__}: {error}')
+    return record
+
+
+def compare(results, baseline, tolerance):
+    """
+    compare matches results to baseline records with the same kernel, K
+    and N, and returns the cases that slowed down by more than tolerance.
+    """
+    reference = {(r['kernel'], r['K'], r['N']): r for r in baseline['results'] if r.get('status') == 'ok'}
+    regressions = []
+    for r in results:
+        base = reference.get((r['kernel'], r['K'], r['N']))
+        if base is None or r['status'] != 'ok':
+            continue
+        r['baseline_wall_time'] = base['wall_time']
+        r['ratio'] = r['wall_time'] / base['wall_time']
+        if r['ratio'] > 1 + tolerance:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the DER simulation kernels.')
+    parser.add_argument('--kernels', nargs='+', choices=sorted(KERNELS), default=sorted(KERNELS))
+    parser.add_argument('--horizons', nargs='+', choices=list(HORIZONS), default=list(HORIZONS))
+    parser.add_argument('--N', nargs='+', type=int, default=FLEET_SIZES, help='fleet sizes')
+    parser.add_argument('--quick', action='store_true', help='one week and fleets of at most 100')
+    parser.add_argument('--repeat', type=int, default=1, help='timed runs per case (best is kept)')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='skip the traced memory run')
+    parser.add_argument('--output', default=os.path.join(HERE, 'results.json'))
+    parser.add_argument('--baseline', default=os.path.join(HERE, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before flagging')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.horizons = ['week']
+        args.N = [n for n in args.N if n <= 100]
+
+    # sweep K for every kernel, and N for fleet kernels
+    cases = []
+    for name in args.kernels:
+        cases += [(name, HORIZONS[h], 1) for h in args.horizons]
+        if KERNELS[name][1]:
+            cases += [(name, FLEET_HORIZON, n) for n in args.N]
+
+    results = []
+    for name, K, N in cases:
+        record = run_case(name, K, N, args.repeat, args.memory)
+        results.append(record)
+        if record['status'] == 'ok':
+            memory = '' if record['peak_memory_mb'] is None else f"{record['peak_memory_mb']:10.1f} MB"
+            print(f"{name:30s} K={K:7d} N={N:6d} {record['wall_time']:10.4f} s "
+                  f"{record['steps_per_second']:14.0f} steps/s {memory}")
+        else:
+            print(f"{name:30s} K={K:7d} N={N:6d} {record['status']} ({record['error']})")
+    errors = [r for r in results if r['status'] == 'error']
+
+    # compare against the stored baseline
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['kernel']} K={r['K']} N={r['N']}: "
+                  f"{r['wall_time']:.4f} s vs {r['baseline_wall_time']:.4f} s ({r['ratio']:.2f}x)")
+
+    # write results
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.baseline if args.save_baseline else args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    return 1 if regressions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
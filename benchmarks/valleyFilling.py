@@ -0,0 +1,99 @@
+"""
+Introduction:
+This script times the valley-filling managed-charging scheduler on a fleet
+of electric vehicles (10,000 by default) from noon to noon at 1-minute
+steps. Trips come from generate_driving_power, and each vehicle is plugged
+in once, from its last trip of the evening to its first trip of the next
+morning. The base load is a synthetic feeder profile with an evening peak,
+so no data files are needed. The coordinated schedule's peak is compared
+with that of uncoordinated charging to the same charge under policies 1
+and 3 (simulate_fleet_policy1 and simulate_fleet_policy3).
+
+The script exits with status 1 if the scheduler takes longer than the
+target.
+
+Usage (from the repository root):
+    python benchmarks/valleyFilling.py
+    python benchmarks/valleyFilling.py --vehicles 1000 --sweeps 5 --target 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# repository root, one level above this file
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import ders
+
+
+def fleet(N, dt, rng):
+    """
+    fleet generates noon-to-noon plug-in indicators, driving powers and
+    vehicle parameters for N electric vehicles.
+    """
+    t = np.arange(0, 48 + dt / 2, dt)  # two days, h
+    K = round(24 / dt)  # steps per day
+    p_chem_drive = ders.generate_driving_power(t, 0.2, N, rng)[:, K // 2:K // 2 + K]  # chemical driving power, kW
+    driving = p_chem_drive > 0
+    step = np.arange(K)
+
+    # plugged in from the last trip before midnight to the first trip after
+    arrival = np.max(np.where(driving & (step < K // 2), step + 1, 0), axis=1)
+    departure = np.min(np.where(driving & (step >= K // 2), step, K), axis=1)
+    z = (step >= arrival[:, None]) & (step < departure[:, None])
+    x_max = rng.choice([60., 80.], N)  # battery capacities, kWh
+    pc_max = rng.choice([7.2, 11.5], N)  # charging powers, kW
+    return 12 + t[:K + 1], z, p_chem_drive, x_max, pc_max
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the valley-filling charging scheduler.')
+    parser.add_argument('--vehicles', type=int, default=10000, help='number of vehicles')
+    parser.add_argument('--sweeps', type=int, default=10, help='maximum sweeps over the fleet')
+    parser.add_argument('--target', type=float, default=60.0, help='maximum scheduling time, s')
+    parser.add_argument('--output', default=None, help='optional JSON file for the results')
+    args = parser.parse_args(argv)
+
+    dt = 1 / 60  # time step, h
+    tau = 1600  # self-dissipation time constant, h
+    etac, etad = 0.95, 0.95  # charging and discharging efficiencies
+    a = ders.discretize_first_order(tau, dt)
+    N = args.vehicles
+    t, z, p_chem_drive, x_max, pc_max = fleet(N, dt, np.random.default_rng(0))
+    hour = np.mod(t[:-1], 24)
+    base = N * (1 + 0.8 * np.exp(-((hour - 19) / 3) ** 2) + 0.4 * np.cos(np.pi * (hour - 15) / 12))  # feeder load, kW
+    x0 = 0.6 * x_max  # charges at noon, kWh
+    x_star = 0.9 * x_max  # desired charges at departure, kWh
+
+    results = {'vehicles': N, 'steps': len(hour), 'base_peak': base.max()}
+    print(f'{N} vehicles, {len(hour)} steps, base peak {base.max() / 1e3:.1f} MW')
+    # uncoordinated charging to x_star: at maximum on arrival, or at constant power to 6 am
+    _, p1 = ders.simulate_fleet_policy1(x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_star, aggregate=True)
+    _, p3 = ders.simulate_fleet_policy3(x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_star, t, 6,
+                                        x_star, aggregate=True)
+    for name, p in (('policy 1', p1), ('policy 3', p3)):
+        results[name] = (base + p).max()
+        print(f'{name:20s} peak {(base + p).max() / 1e3:6.1f} MW  energy {p.sum() * dt / 1e3:6.1f} MWh')
+
+    start = time.perf_counter()
+    x, p = ders.valley_filling(x0, z, p_chem_drive, a, tau, etac, pc_max, x_star, base, sweeps=args.sweeps)
+    elapsed = time.perf_counter() - start
+    total = base + p.sum(axis=0)  # aggregate load, kW
+    results.update({'valley filling': total.max(), 'time': elapsed, 'target': args.target})
+    print(f'{"valley filling":20s} peak {total.max() / 1e3:6.1f} MW  energy {p.sum() * dt / 1e3:6.1f} MWh  '
+          f'{elapsed:.2f} s  {"ok" if elapsed <= args.target else "slow"}')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if elapsed > args.target else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+from scipy.optimize import brentq
+
+
+def event_thermostatic_control(Ac, Bc, w, T0, Tset, qcMin, qcMax, dT, dt, n_sub=1, u0=0):
+    """
+    eventThermostaticControl simulates thermostatic control of a 2R2C
+    building model in continuous time. Rather than checking the deadband at
+    every time step, it solves for the next deadband crossing analytically
+    and jumps straight to it. The heater turns on when the indoor
+    temperature falls to Tset - dT, turns off when it rises to Tset + dT,
+    and otherwise does what it did before.
+
+    The inputs w, Tset, qcMin and qcMax are held constant over each input
+    time step. Between switching times the state follows the exact
+    solution x(t) = xs + expm(Ac t) (x(0) - xs), evaluated through the
+    eigendecomposition of Ac. The cost therefore grows with the number of
+    input steps and switches, not with the resolution of the output grid.
+    As the fixed-step loop in thermostaticControl is refined, its
+    trajectories converge to these.
+
+    Input:
+      Ac, the 2 x 2 continuous-time dynamics matrix, 1/h
+      Bc, the 2 x 1 continuous-time input matrix, C/kWh
+      w, the K x 1 disturbance vector, kW
+      T0, the 2 x 1 initial state vector, C
+      Tset, the K+1 x 1 temperature setpoint vector, C
+      qcMin, the K x 1 minimum HVAC thermal power capacity, kW
+      qcMax, the K x 1 maximum HVAC thermal power capacity, kW
+      dT, the thermostat deadband halfwidth, C (must be positive)
+      dt, the input time step, h
+      n_sub, the number of output time steps per input time step
+      u0, the initial HVAC on/off state
+
+    Output:
+      T, the 2 x K*n_sub+1 state on the output grid, C
+      qc, the K*n_sub x 1 HVAC thermal power averaged over each output step, kW
+      t_switch, the times at which the HVAC switched on or off, h
+    """
+
+    if dT <= 0:
+        raise ValueError('The deadband halfwidth dT must be positive.')
+
+    # dimensions
+    K = len(w)
+    w = np.asarray(w, dtype=float)
+    Tset = np.asarray(Tset, dtype=float)
+    qcMin = np.broadcast_to(np.asarray(qcMin, dtype=float), (K,))
+    qcMax = np.broadcast_to(np.asarray(qcMax, dtype=float), (K,))
+
+    # modal decomposition, expm(Ac t) = V diag(exp(lam t)) V^-1
+    Ac = np.asarray(Ac, dtype=float)
+    lam, V = np.linalg.eig(Ac)
+    if np.iscomplexobj(lam):
+        raise ValueError('Ac must have real eigenvalues, as any RC circuit does.')
+    Vi = np.linalg.inv(V)
+    s = -np.linalg.solve(Ac, np.asarray(Bc, dtype=float).reshape(2))  # steady state per kW of input, C/kW
+    l0, l1 = lam
+    v00, v01, v10, v11 = V.ravel()
+    vi00, vi01, vi10, vi11 = Vi.ravel()
+    s0, s1 = s
+
+    # piecewise solution storage: start time, steady state, modal coordinates, thermal power
+    p_start, p_xs0, p_xs1, p_c0, p_c1, p_q = [], [], [], [], [], []
+    t_switch = []
+
+    # simulation
+    x0, x1 = (float(v) for v in np.ravel(T0))  # air and mass temperature, C
+    on = bool(u0)  # HVAC on/off state
+    for k in range(K):
+        # control decision at the start of the step, as in the fixed-step loop
+        if x0 < Tset[k] - dT:
+            on = True
+        elif x0 > Tset[k] + dT:
+            on = False
+
+        tau = 0.0  # time elapsed within the step, h
+        while True:
+            # exact solution under constant input
+            q = qcMax[k] if on else qcMin[k]  # HVAC thermal power, kW
+            xs0, xs1 = s0 * (q + w[k]), s1 * (q + w[k])  # steady state, C
+            c0 = vi00 * (x0 - xs0) + vi01 * (x1 - xs1)
+            c1 = vi10 * (x0 - xs0) + vi11 * (x1 - xs1)
+            p_start.append(k * dt + tau)
+            p_xs0.append(xs0)
+            p_xs1.append(xs1)
+            p_c0.append(c0)
+            p_c1.append(c1)
+            p_q.append(q)
+
+            # next deadband crossing within the step, if any
+            theta = Tset[k] + dT if on else Tset[k] - dT  # switching threshold, C
+            sign = 1.0 if on else -1.0  # direction of the crossing
+            a0, a1 = v00 * c0, v01 * c1
+            f = lambda t: sign * (xs0 + a0 * math.exp(l0 * t) + a1 * math.exp(l1 * t) - theta)
+            tau_hit = _first_root(f, a0 * l0, a1 * l1, l0, l1, dt - tau)
+
+            # advance to the crossing or to the end of the step
+            h = dt - tau if tau_hit is None else tau_hit
+            e0, e1 = math.exp(l0 * h), math.exp(l1 * h)
+            x0 = xs0 + v00 * c0 * e0 + v01 * c1 * e1
+            x1 = xs1 + v10 * c0 * e0 + v11 * c1 * e1
+            if tau_hit is None:
+                break
+            tau += tau_hit
+            on = not on
+            t_switch.append(k * dt + tau)
+
+    # output grid
+    p_start = np.array(p_start)
+    p_q = np.array(p_q)
+    h_out = dt / n_sub  # output time step, h
+    t_out = np.arange(K * n_sub + 1) * h_out
+    t_out[-1] = K * dt
+
+    # state on the output grid
+    i = np.searchsorted(p_start, t_out, side='right') - 1  # index of active piece
+    tau = t_out - p_start[i]
+    c0, c1 = np.array(p_c0)[i], np.array(p_c1)[i]
+    e0, e1 = np.exp(l0 * tau), np.exp(l1 * tau)
+    T = np.vstack((np.array(p_xs0)[i] + v00 * c0 * e0 + v01 * c1 * e1,
+                   np.array(p_xs1)[i] + v10 * c0 * e0 + v11 * c1 * e1))
+
+    # average thermal power over each output step, from the cumulative energy
+    E = np.concatenate(([0.0], np.cumsum(p_q[:-1] * np.diff(p_start))))  # energy at piece starts, kWh
+    E_out = E[i] + p_q[i] * tau  # energy at output times, kWh
+    qc = np.diff(E_out) / h_out
+
+    return T, qc, np.array(t_switch)
+
+
+def _first_root(f, d0, d1, l0, l1, t_max):
+    # f is sign * (c + a0 exp(l0 t) + a1 exp(l1 t)), so f' has at most one
+    # zero and f is monotone on either side of it. Return the first t in
+    # (0, t_max] at which f rises from negative to zero, or None.
+    knots = [0.0]
+    if d0 * d1 < 0 and l0 != l1:
+        t_stat = math.log(-d1 / d0) / (l0 - l1)  # stationary point of f
+        if 0 < t_stat < t_max:
+            knots.append(t_stat)
+    knots.append(t_max)
+    for a, b in zip(knots[:-1], knots[1:]):
+        fa, fb = f(a), f(b)
+        if fa <= 0 <= fb and fa < fb:
+            return brentq(f, a, b, xtol=1e-12)
+    return None
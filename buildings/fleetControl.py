@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def fleet_control(A, B, w, T0, Tset, qcMin, qcMax, dT=None, u0=0, block=1024):
+    """
+    fleetControl simulates a fleet of N buildings, each modeled as a 2R2C
+    thermal circuit, by stepping every building forward together with
+    vectorized updates. Each building follows the same policy as the
+    single-building functions:
+
+      dT is None: (near-) perfect setpoint tracking, as in
+          perfectTrackingControl. The heater tries to place the next indoor
+          air temperature exactly at the setpoint, saturating at capacity.
+      dT given: thermostatic control, as in thermostaticControl. The heater
+          turns on below Tset - dT, turns off above Tset + dT, and otherwise
+          does what it did at the previous time step.
+
+    The dynamics are T[:, k+1] = A T[:, k] + B (qc[k] + w[k]) for each
+    building. Inputs that are shared by every building may be passed
+    without the leading N dimension.
+
+    Input:
+      A, the N x 2 x 2 (or 2 x 2) discrete-time dynamics matrices
+      B, the N x 2 (or 2 x 1) discrete-time input matrices
+      w, the N x K disturbance matrix, kW
+      T0, the N x 2 (or 2 x 1) initial state vectors, C
+      Tset, the N x K+1 (or K+1 x 1) temperature setpoints, C
+      qcMin, the N x K (or K x 1) minimum HVAC thermal power capacities, kW
+      qcMax, the N x K (or K x 1) maximum HVAC thermal power capacities, kW
+      dT, the thermostat deadband halfwidth(s), C (scalar or N x 1), or None
+          for perfect tracking control
+      u0, the initial HVAC on/off state(s) for thermostatic control
+      block, the number of time steps of w to transpose at once
+
+    Output:
+      T, the N x 2 x K+1 state [indoor air temperature; thermal mass temperature], C
+      qc, the N x K HVAC thermal power matrix, kW
+    """
+
+    # dimensions
+    w = np.atleast_2d(w)
+    N, K = w.shape
+
+    # per-building dynamics coefficients, each a length-N vector
+    A = np.broadcast_to(np.asarray(A, dtype=float), (N, 2, 2))
+    B = np.broadcast_to(np.asarray(B, dtype=float).reshape(-1, 2), (N, 2))
+    a00, a01, a10, a11 = A[:, 0, 0].copy(), A[:, 0, 1].copy(), A[:, 1, 0].copy(), A[:, 1, 1].copy()
+    b0, b1 = B[:, 0].copy(), B[:, 1].copy()
+
+    # time-major views of the time-varying inputs, so each step reads a contiguous row
+    def time_major(x, n):
+        x = np.asarray(x, dtype=float)
+        return np.broadcast_to(x.T if x.ndim == 2 else x[:, None], (n, N))
+    Tset = time_major(Tset, K + 1)
+    qcMin = time_major(qcMin, K)
+    qcMax = time_major(qcMax, K)
+
+    # data storage (time-major, returned as building-major views)
+    T = np.zeros((K + 1, 2, N))  # state [indoor air temperature; thermal mass temperature], C
+    T[0] = np.broadcast_to(np.asarray(T0, dtype=float).reshape(-1, 2), (N, 2)).T  # initial state, C
+    qc = np.zeros((K, N))  # HVAC thermal power, kW
+
+    # thermostat state
+    thermostatic = dT is not None
+    if thermostatic:
+        dT = np.broadcast_to(np.asarray(dT, dtype=float), (N,))
+        u = np.broadcast_to(np.asarray(u0, dtype=bool), (N,)).copy()  # HVAC on/off state
+
+    # simulation
+    for k0 in range(0, K, block):
+        wk = np.ascontiguousarray(w[:, k0:k0 + block].T)  # disturbance block, kW
+        for j in range(wk.shape[0]):
+            k = k0 + j
+            x0, x1 = T[k]
+
+            # control decision
+            if thermostatic:
+                u[x0 < Tset[k] - dT] = True  # turn on below the deadband
+                u[x0 > Tset[k] + dT] = False  # turn off above the deadband
+                qc[k] = np.where(u, qcMax[k], qcMin[k])
+            else:
+                q = (Tset[k + 1] - a00 * x0 - a01 * x1) / b0 - wk[j]  # thermal power to hit the setpoint, kW
+                np.clip(q, qcMin[k], qcMax[k], out=qc[k])
+
+            # dynamic update
+            uk = qc[k] + wk[j]  # total thermal power into the air, kW
+            T[k + 1, 0] = a00 * x0 + a01 * x1 + b0 * uk
+            T[k + 1, 1] = a10 * x0 + a11 * x1 + b1 * uk
+
+    return T.transpose(2, 1, 0), qc.T
@@ -0,0 +1,115 @@
+import numpy as np
+from resamplingPlan import resampling_plan
+
+
+def load_electricity(file_name, t_span, groups=None, dtype=np.float32, chunksize=200000):
+    """
+    loadElectricity imports electrical load data from the MFRED (Multi
+    Family Residential Electricity Demand) csv file, reading only the kW
+    columns of the requested apartment groups. The file is streamed in
+    chunks and only rows that fall inside t_span are kept, so multi-year
+    files can be loaded without holding them in memory.
+
+    The MFRED file has a timestamp column (UTC), three aggregate columns,
+    and then kW, kVA and kVAR columns for each of 26 groups of 15
+    apartments.
+
+    Input:
+      file_name, the name of the MFRED file.
+      t_span, the K x 1 datetime span (Eastern standard time).
+      groups, a list of apartment group indices in 0, ..., 25 (default: all).
+      dtype, the floating-point type of the output.
+      chunksize, the number of csv rows to parse at once.
+
+    Output:
+      P, a K x n matrix of electricity demand data in kW, one column per group
+    """
+
+    import pandas as pd
+
+    # column positions of the requested kW columns
+    header = pd.read_csv(file_name, nrows=0).columns
+    n_groups = (len(header) - 4) // 3  # number of apartment groups
+    if groups is None:
+        groups = range(n_groups)
+    groups = [int(i) for i in groups]
+    if any(i < 0 or i >= n_groups for i in groups):
+        raise ValueError(f'Apartment group indices must lie in 0, ..., {n_groups - 1}.')
+    power_columns = [header[4 + 3 * i] for i in groups]
+
+    # time span in ns since 1970-01-01
+    t_ns = np.asarray(t_span, dtype='datetime64[ns]').view(np.int64)
+    t_first, t_last = t_ns.min(), t_ns.max()
+
+    # stream the file, keeping only rows inside the time span
+    times, values = [], []
+    reader = pd.read_csv(
+        file_name,
+        usecols=[header[0]] + power_columns,
+        dtype={column: dtype for column in power_columns},
+        chunksize=chunksize
+    )
+    for chunk in reader:
+        # typed, vectorized timestamp parsing
+        ns, valid = _parse_timestamps(chunk.iloc[:, 0])
+
+        # keep rows inside the time span
+        keep = valid & (ns >= t_first) & (ns <= t_last)
+        if keep.any():
+            times.append(ns[keep])
+            values.append(chunk[power_columns].to_numpy(dtype=dtype)[keep])
+
+    K, n = len(t_ns), len(power_columns)
+    if not times:
+        return np.full((K, n), np.nan, dtype=dtype)
+    times = np.concatenate(times)
+    values = np.concatenate(values)
+
+    # sort by time
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    values = values[order]
+
+    # fill any missing data
+    rows = np.arange(len(times))
+    for j in range(n):
+        missing = np.isnan(values[:, j])
+        if missing.any() and not missing.all():
+            fill = missing & (rows > np.argmax(~missing))  # leading gaps stay missing
+            values[fill, j] = np.interp(rows[fill], rows[~missing], values[~missing, j])
+
+    # retime to the desired time span
+    P = resampling_plan(times.view('datetime64[ns]'), t_ns.view('datetime64[ns]')).apply(values).astype(dtype, copy=False)
+
+    return P
+
+
+def _parse_timestamps(column):
+    # Parse 'm/d/yy H:M' UTC strings to Eastern ns since 1970-01-01. Dates
+    # and times of day repeat across rows, so each distinct one is parsed once.
+    import pandas as pd
+
+    parts = column.astype(str).str.split(' ', n=1, expand=True).reindex(columns=[0, 1])
+    day_codes, days = pd.factorize(parts[0])
+    time_codes, times = pd.factorize(parts[1])
+
+    # dates, fixing the year from e.g. 20 to 2020
+    days = pd.to_datetime(pd.Series(days), format='%m/%d/%y', errors='coerce')
+    early = days.dt.year < 2000
+    if early.any():
+        days[early] = days[early] + pd.DateOffset(years=2000)
+    day_ns = days.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    day_ok = days.notna().to_numpy()
+
+    # times of day
+    times = pd.to_timedelta(pd.Series(times, dtype=object) + ':00', errors='coerce')
+    time_ns = times.to_numpy(dtype='timedelta64[ns]').view(np.int64)
+    time_ok = times.notna().to_numpy()
+
+    # combine and convert UTC to eastern
+    valid = (day_codes >= 0) & (time_codes >= 0)
+    valid[valid] = day_ok[day_codes[valid]] & time_ok[time_codes[valid]]
+    ns = np.zeros(len(column), dtype=np.int64)
+    ns[valid] = day_ns[day_codes[valid]] + time_ns[time_codes[valid]] - 5 * 3600 * 10 ** 9
+
+    return ns, valid
@@ -0,0 +1,151 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from discretizeRC import discretize_2r2c
+from fleetControl import fleet_control
+
+# per-scenario summary table
+SUMMARY_DTYPE = np.dtype([
+    ('scenario', np.int64),  # scenario index
+    ('profile', np.int64),  # index of the MFRED plug power profile
+    ('peak_qc', float),  # peak HVAC thermal power, kW
+    ('energy', float),  # HVAC thermal energy, kWh
+    ('discomfort', float),  # temperature deficit below Tset - dT, C h
+])
+
+# shared read-only inputs, attached once per worker process
+_shared = {}
+
+
+def monte_carlo_2r2c(M, Tout, I, plug_powers, Tset, dt, Af=200, N=2, qcMax=14, dT=0.5,
+                     seed=None, n_workers=None, batch=64, callback=None):
+    """
+    monteCarlo2R2C runs M stochastic scenarios of the 2R2C building model
+    under thermostatic control and returns a summary of each one. Each
+    scenario draws a random MFRED plug power profile and Gaussian noise in
+    the exogenous thermal power, as in simulate2R2C.py.
+
+    Every scenario gets its own random generator, spawned from one
+    SeedSequence, so results are reproducible and do not depend on the
+    number of workers. Scenarios are simulated in batches with fleetControl
+    across a process pool. The weather and plug power arrays are placed in
+    shared memory once rather than pickled to each task, and each finished
+    batch is written into the result table as it arrives.
+
+    Input:
+      M, the number of scenarios
+      Tout, the K x 1 outdoor temperature, C
+      I, the K x 1 total horizontal solar irradiance, kW/m^2
+      plug_powers, the K x n matrix of MFRED plug power profiles, kW
+      Tset, the K+1 x 1 indoor temperature setpoint, C
+      dt, the time step, h
+      Af, the floor area, m^2
+      N, the number of stories
+      qcMax, the heater capacity, kW
+      dT, the thermostat deadband halfwidth, C
+      seed, the seed of the root SeedSequence (None for fresh entropy)
+      n_workers, the number of worker processes (default: all cores; 1 runs
+          in this process)
+      batch, the number of scenarios per task
+      callback, an optional function called with each finished block of
+          summary rows
+
+    Output:
+      results, an M x 1 structured array with fields scenario, profile,
+          peak_qc (kW), energy (kWh) and discomfort (C h)
+    """
+
+    # building model
+    C = 0.0125 * Af  # air thermal capacitance, kWh/C
+    Cm = 12 * C  # mass thermal capacitance, kWh/C
+    R = 1 / (0.016 * np.sqrt(N * Af))  # indoor-outdoor thermal resistance, C/kW
+    Rm = R / 6  # indoor-mass thermal resistance, C/kW
+    A, B = discretize_2r2c(R, C, Rm, Cm, dt)
+
+    # deterministic part of the disturbance
+    lam = 0.25  # glazing ratio
+    c = 0.4  # solar heat gain coefficient
+    w_base = 4.8 * c * lam * np.sqrt(N * Af * np.asarray(I)) + 1 + np.asarray(Tout) / R  # kW
+    arrays = {'w_base': w_base, 'plug_powers': np.asarray(plug_powers, dtype=float), 'Tset': np.asarray(Tset, dtype=float)}
+    settings = {'A': A, 'B': B, 'qcMax': qcMax, 'dT': dT, 'dt': dt}
+
+    # independent random streams, one per scenario
+    children = np.random.SeedSequence(seed).spawn(M)
+    tasks = [(m0, children[m0:m0 + batch]) for m0 in range(0, M, batch)]
+
+    results = np.zeros(M, dtype=SUMMARY_DTYPE)
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+
+    def store(rows):
+        results[rows['scenario']] = rows
+        if callback is not None:
+            callback(rows)
+
+    if n_workers <= 1:
+        _shared.update(arrays, settings=settings)
+        try:
+            for task in tasks:
+                store(_run_batch(task))
+        finally:
+            _shared.clear()
+        return results
+
+    # share the read-only arrays with the workers
+    blocks = []
+    try:
+        specs = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            specs[name] = (block.name, array.shape, array.dtype.str)
+        with ProcessPoolExecutor(n_workers, initializer=_attach, initargs=(specs, settings)) as pool:
+            for future in as_completed([pool.submit(_run_batch, task) for task in tasks]):
+                store(future.result())
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return results
+
+
+def _attach(specs, settings):
+    # map the shared arrays into this worker without copying
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared[name + '_block'] = block  # keep the mapping alive
+        _shared[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    _shared['settings'] = settings
+
+
+def _run_batch(task):
+    # simulate one batch of scenarios and summarize each
+    m0, seeds = task
+    settings = _shared['settings']
+    w_base, plug_powers, Tset = _shared['w_base'], _shared['plug_powers'], _shared['Tset']
+    K = len(w_base)
+
+    # scenario disturbances, each from its own generator
+    profile = np.zeros(len(seeds), dtype=np.int64)
+    w = np.empty((len(seeds), K))
+    for j, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        profile[j] = rng.integers(plug_powers.shape[1])
+        w[j] = w_base + plug_powers[:, profile[j]] + (0.5 / 3) * rng.standard_normal(K)
+
+    # simulate the batch together
+    T0 = np.array([Tset[0], np.mean(Tset)])  # initial air and mass temperature, C
+    T, qc = fleet_control(settings['A'], settings['B'], w, T0, Tset, np.zeros(K), np.full(K, settings['qcMax']),
+                          settings['dT'])
+
+    # summaries
+    rows = np.zeros(len(seeds), dtype=SUMMARY_DTYPE)
+    rows['scenario'] = np.arange(m0, m0 + len(seeds))
+    rows['profile'] = profile
+    rows['peak_qc'] = qc.max(axis=1)
+    rows['energy'] = qc.sum(axis=1) * settings['dt']
+    rows['discomfort'] = np.maximum(0, Tset[:K] - settings['dT'] - T[:, 0, :K]).sum(axis=1) * settings['dt']
+    return rows
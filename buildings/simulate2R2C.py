@@ -16,29 +16,35 @@ Please make sure the following functions are available:
 # ==============================================================================
 # Required imports
 # ==============================================================================
+import sys
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from perfectTrackingError import perfect_tracking_control
 from thermostaticControl import thermostatic_control
-from plotRCresults import plot_rc_results
 from scipy.linalg import expm
 from importWeather import import_weather
 from importElectricty import import_electricity
+from resamplingPlan import replace_year
 
 
 # ==============================================================================
 # Graphics settings
 # ==============================================================================
+# run with --no-plot to simulate without graphics (e.g. in batch jobs)
+to_plot = '--no-plot' not in sys.argv  # indicator of whether to plot results
 
-plt.rc('font', size=20)
-plt.rc('axes', titlesize=24, labelsize=20)
-plt.rc('xtick', labelsize=20)
-plt.rc('ytick', labelsize=20)
-plt.rc('legend', fontsize=12)
-plt.rc('figure', titlesize=20)
-plt.rc('lines', linewidth=3)
+if to_plot:
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    from plotRCresults import plot_rc_results
+
+    plt.rc('font', size=20)
+    plt.rc('axes', titlesize=24, labelsize=20)
+    plt.rc('xtick', labelsize=20)
+    plt.rc('ytick', labelsize=20)
+    plt.rc('legend', fontsize=12)
+    plt.rc('figure', titlesize=20)
+    plt.rc('lines', linewidth=3)
 
 
 # ==============================================================================
@@ -93,7 +99,7 @@ Tout, I = import_weather(weather_file, t_span)
 
 # Electricity data import
 electricity_file = 'MFRED-2019-NYC-Apartments-Electricity-Data.csv'
-t_elec = t_span.map(lambda x: x.replace(year=2019))
+t_elec = replace_year(t_span, 2019)
 plug_powers = import_electricity(electricity_file, t_elec)
 
 # Exogenous thermal power
@@ -112,29 +118,30 @@ Tset[:len(t)][np.mod(t, 24) < 6] = 18.5 #night setpoint, C
 Tset[:len(t)][np.mod(t, 24) > 22] = 18.5 #night setpoint, C
 
 # %% input signal plot
-plt.figure(1)
-plt.clf()
-
-# First subplot (Outdoor Temperature)
-ax1 = plt.subplot(2, 1, 1)
-plt.plot(t_span, Tout, 'k')
-plt.ylabel('Outdoor \n temperature \n (°C)', fontsize=16)
-plt.xticks(fontsize=14)
-plt.yticks(fontsize=14)
-plt.grid(True, linestyle='--', alpha=0.7)
-ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %d %Y'))
-
-# Second subplot (Exogenous Thermal Power)
-ax2 = plt.subplot(2, 1, 2)
-plt.plot(t_span, qe, 'k')
-plt.ylabel('Exogenous \n thermal power \n (kW)', fontsize=16)
-plt.xticks(fontsize=14)
-plt.yticks(fontsize=14)
-plt.grid(True, linestyle='--', alpha=0.7)
-ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b %d %Y'))
-
-plt.tight_layout()
-plt.show()
+if to_plot:
+    plt.figure(1)
+    plt.clf()
+
+    # First subplot (Outdoor Temperature)
+    ax1 = plt.subplot(2, 1, 1)
+    plt.plot(t_span, Tout, 'k')
+    plt.ylabel('Outdoor \n temperature \n (°C)', fontsize=16)
+    plt.xticks(fontsize=14)
+    plt.yticks(fontsize=14)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %d %Y'))
+
+    # Second subplot (Exogenous Thermal Power)
+    ax2 = plt.subplot(2, 1, 2)
+    plt.plot(t_span, qe, 'k')
+    plt.ylabel('Exogenous \n thermal power \n (kW)', fontsize=16)
+    plt.xticks(fontsize=14)
+    plt.yticks(fontsize=14)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b %d %Y'))
+
+    plt.tight_layout()
+    plt.show()
 
 # ==============================================================================
 
@@ -146,7 +153,8 @@ T0 = np.array([Tset[0], np.mean(Tset)])  # initial air and mass temperature, C
 T1, qc1 = perfect_tracking_control(A, B, w, T0, Tset, qcMin, qcMax)
 
 # plot results
-plot_rc_results(t, Tset[:-1], T1[0, :-1], T1[1, :-1], qc1, 2)
+if to_plot:
+    plot_rc_results(t, Tset[:-1], T1[0, :-1], T1[1, :-1], qc1, 2)
 
 # ==============================================================================
 
@@ -156,4 +164,5 @@ dT = 0.5  # thermostat deadband halfwidth, C
 T2, qc2 = thermostatic_control(A, B, w, T0, Tset, qcMin, qcMax, dT)
 
 # plot results
-plot_rc_results(t, Tset[:-1], T2[0, :-1], T2[1, :-1], qc2, 3)
+if to_plot:
+    plot_rc_results(t, Tset[:-1], T2[0, :-1], T2[1, :-1], qc2, 3)
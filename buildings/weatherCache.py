@@ -0,0 +1,106 @@
+import hashlib
+import os
+import shutil
+
+import numpy as np
+
+# channels stored in the cache, in the order returned by import_weather
+CHANNELS = ('timestamp', 'temperature', 'total_horizontal', 'beam_normal', 'diffuse_horizontal', 'offset_gmt')
+
+
+def weather_cache(file_name, cache_dir=None):
+    """
+    weatherCache loads an OikoLab CSV weather file through a memory-mapped
+    columnar cache. On first use, the CSV is parsed once and written as one
+    .npy array per channel. Later calls map those arrays straight from disk
+    without parsing or copying. The cache is keyed by the file's absolute
+    path, size and modification time, so editing the CSV invalidates it.
+    Entries are named stem-source-key, with source a digest of the path
+    alone, so rebuilding removes the older entries of the same file but
+    never those of another file with the same name sharing cache_dir.
+
+    Input:
+      file_name, the name of the OikoLab CSV weather file.
+      cache_dir, the directory to store cache files in (default: a
+          .weather-cache directory next to the CSV file).
+
+    Output:
+      columns, a dict of read-only memory-mapped arrays with keys
+        timestamp, local time in ns since 1970-01-01 (int64)
+        temperature, the outdoor temperature in C
+        total_horizontal, the total horizontal irradiance in kW/m^2
+        beam_normal, the beam normal irradiance in kW/m^2
+        diffuse_horizontal, the diffuse horizontal irradiance in kW/m^2
+        offset_gmt, (local time) - (Greenwich mean time) in hours
+    """
+
+    # cache key from file fingerprint
+    path = os.path.abspath(file_name)
+    stat = os.stat(path)
+    fingerprint = f'{path}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode()
+    key = hashlib.sha1(fingerprint).hexdigest()[:16]
+    source = hashlib.sha1(path.encode()).hexdigest()[:8]  # digest of the path only
+    prefix = f'{os.path.splitext(os.path.basename(path))[0]}-{source}-'  # shared by every version of the file
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), '.weather-cache')
+    entry = os.path.join(cache_dir, prefix + key)
+
+    # build the cache on first use
+    if not os.path.isdir(entry):
+        _build_weather_cache(path, cache_dir, prefix, entry)
+
+    # map the columns without copying
+    return {name: np.load(os.path.join(entry, name + '.npy'), mmap_mode='r') for name in CHANNELS}
+
+
+def _build_weather_cache(path, cache_dir, prefix, entry):
+    import pandas as pd
+
+    # import raw data
+    weather_data = pd.read_csv(path)
+
+    # parse timestamps in one vectorized pass
+    timestamp = pd.to_datetime(weather_data.iloc[:, 0], format='%m/%d/%y %H:%M', errors='coerce')
+
+    # fix year only if it's before 2000 to avoid overflow issues
+    mask = timestamp.dt.year < 2000
+    if mask.any():
+        timestamp[mask] = timestamp[mask] + pd.DateOffset(years=2000)
+
+    # convert UTC to local time
+    offset_gmt = weather_data.iloc[:, 4].to_numpy(dtype=float)
+    timestamp = timestamp + pd.to_timedelta(offset_gmt, unit='h')
+
+    # extract data, convert units and fill any missing data
+    channels = pd.DataFrame({
+        'temperature': weather_data.iloc[:, 5].to_numpy(dtype=float),  # outdoor air temperature, C
+        'total_horizontal': weather_data.iloc[:, 6].to_numpy(dtype=float) / 1000,  # total horizontal irradiance, kW/m^2
+        'beam_normal': weather_data.iloc[:, 7].to_numpy(dtype=float) / 1000,  # beam normal irradiance, kW/m^2
+        'diffuse_horizontal': weather_data.iloc[:, 8].to_numpy(dtype=float) / 1000,  # diffuse horizontal irradiance, kW/m^2
+        'offset_gmt': offset_gmt,  # (local time) - (GMT), h
+    }).interpolate(method='linear')
+
+    # drop rows with unparseable timestamps
+    valid = timestamp.notna().to_numpy()
+    columns = {'timestamp': timestamp[valid].to_numpy(dtype='datetime64[ns]').view(np.int64)}
+    for name in CHANNELS[1:]:
+        columns[name] = channels[name].to_numpy()[valid]
+
+    # write to a private directory, then publish it with an atomic rename
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{entry}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(values))
+    try:
+        os.replace(tmp, entry)
+    except OSError:
+        # another process published the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    # remove stale entries for older versions of the same file (same path)
+    for name in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, name)
+        if len(name) == len(prefix) + 16 and name.startswith(prefix) and stale != entry:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,189 @@
+"""
+ders exposes the simulation kernels in this repository as one importable
+package, for batch jobs and worker processes that do not want the course
+scripts' graphics.
+
+The course directories are flat folders of scripts that import each other
+by bare module name (e.g. from discretizeRC import discretize_2r2c), and
+several of them ship their own copy of the same module. Each directory is
+therefore mapped to a subpackage (buildings/fleetControl.py becomes
+ders.buildings.fleetControl), and a module's bare-name imports resolve to
+modules of its own directory only.
+
+Importing ders loads nothing but the standard library. A kernel is
+imported the first time it is accessed:
+
+    import ders
+    T, qc = ders.fleet_control(A, B, w, T0, Tset, qcMin, qcMax, dT)
+
+No kernel imports matplotlib, and pandas is imported only by the CSV
+loaders (weather_cache, load_electricity and the functions that call them).
+"""
+
+import importlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+# repository root, one level above this package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# subpackage name -> course directory
+DIRECTORIES = {
+    'buildings': 'buildings',
+    'solar': 'solar',
+    'electric_vehicles': 'electric-vehicles',
+    'water_heaters': 'water-heaters',
+    'simple_climate_model': 'simple-climate-model',
+}
+
+# kernel name -> (subpackage, module)
+KERNELS = {
+    # discretization
+    'discretize_1r1c': ('buildings', 'discretizeRC'),
+    'discretize_first_order': ('buildings', 'discretizeRC'),
+    'discretize_2r2c': ('buildings', 'discretizeRC'),
+    'discretize_2r2c_batch': ('buildings', 'discretizeRC'),
+    'first_order_response': ('buildings', 'discretizeRC'),
+    'simulate_segments': ('buildings', 'discretizeRC'),
+    'discretization_cache_info': ('buildings', 'discretizeRC'),
+    'discretization_cache_clear': ('buildings', 'discretizeRC'),
+
+    # data loaders and alignment
+    'weather_cache': ('buildings', 'weatherCache'),
+    'import_weather': ('solar', 'importWeather'),
+    'load_electricity': ('buildings', 'loadElectricity'),
+    'import_electricity': ('buildings', 'importElectricty'),
+    'ResamplingPlan': ('buildings', 'resamplingPlan'),
+    'resampling_plan': ('buildings', 'resamplingPlan'),
+    'resampling_plan_cache_info': ('buildings', 'resamplingPlan'),
+    'replace_year': ('buildings', 'resamplingPlan'),
+
+    # buildings
+    'perfect_tracking_control': ('buildings', 'perfectTrackingError'),
+    'thermostatic_control': ('buildings', 'thermostaticControl'),
+    'fleet_control': ('buildings', 'fleetControl'),
+    'event_thermostatic_control': ('buildings', 'eventThermostaticControl'),
+    'monte_carlo_2r2c': ('buildings', 'monteCarlo2R2C'),
+    'two_timing_2r2c': ('buildings', 'twoTiming2R2C'),
+
+    # solar
+    'generate_electricity_demand': ('solar', 'generateElectricityDemand'),
+    'solar_angles': ('solar', 'solarPosition'),
+    'solar_angles_cache_info': ('solar', 'solarPosition'),
+    'solar_angles_cache_clear': ('solar', 'solarPosition'),
+    'surface_irradiance': ('solar', 'surfaceIrradianceBatch'),
+    'pv_sizing_sweep': ('solar', 'pvSizingSweep'),
+    'cached_electricity_demand': ('solar', 'demandCache'),
+    'demand_cache_info': ('solar', 'demandCache'),
+    'demand_cache_clear': ('solar', 'demandCache'),
+    'solar_pipeline': ('solar', 'solarPipeline'),
+    'battery_dispatch': ('solar', 'batteryDispatch'),
+    'fit_weather_model': ('solar', 'syntheticWeather'),
+    'synthetic_weather': ('solar', 'syntheticWeather'),
+    'StageRunner': ('solar', 'solarStudy'),
+    'solar_study': ('solar', 'solarStudy'),
+    'tou_periods': ('solar', 'tariffBills'),
+    'tariff_bills': ('solar', 'tariffBills'),
+
+    # electric vehicles
+    'generate_driving_power': ('electric_vehicles', 'generateDrivingPower'),
+    'sample_trips': ('electric_vehicles', 'generateDrivingPower'),
+    'FleetAggregator': ('electric_vehicles', 'fleetAggregate'),
+    'simulate_fleet': ('electric_vehicles', 'fleetCharging'),
+    'simulate_fleet_policy1': ('electric_vehicles', 'fleetCharging'),
+    'simulate_fleet_policy2': ('electric_vehicles', 'fleetCharging'),
+    'simulate_fleet_policy3': ('electric_vehicles', 'fleetCharging'),
+    'valley_filling': ('electric_vehicles', 'valleyFilling'),
+    'simulate_policy1': ('electric_vehicles', 'simulatePolicy1'),
+    'simulate_policy2': ('electric_vehicles', 'simulatePolicy2'),
+    'simulate_policy3': ('electric_vehicles', 'simulatePolicy3'),
+
+    # water heaters
+    'get_water_heater_parameters': ('water_heaters', 'getWaterHeaterParameters'),
+    'generate_water_draws': ('water_heaters', 'generateWaterDraws'),
+    'water_heater_control': ('water_heaters', 'waterHeaterControl'),
+
+    # simple climate model
+    'k2c': ('simple_climate_model', 'k2c'),
+    'nonlinear_climate_sim': ('simple_climate_model', 'nonlinearClimateSim'),
+    'linearized_climate_sim': ('simple_climate_model', 'linearizedClimateSim'),
+}
+
+__all__ = sorted(KERNELS)
+
+
+def __getattr__(name):
+    # import kernels on first access
+    if name not in KERNELS:
+        raise AttributeError(f"module 'ders' has no attribute '{name}'")
+    package, module = KERNELS[name]
+    kernel = getattr(importlib.import_module(f'{__name__}.{package}.{module}'), name)
+    globals()[name] = kernel
+    return kernel
+
+
+def __dir__():
+    return sorted(set(globals()) | set(KERNELS))
+
+
+class _CourseLoader(importlib.machinery.SourceFileLoader):
+    # executes a course module with its bare-name imports bound to the
+    # modules of its own directory
+
+    def exec_module(self, module):
+        directory = os.path.dirname(self.path)
+        prefix = module.__name__.rsplit('.', 1)[0] + '.'
+
+        # expose the directory's modules under their bare names, reusing any
+        # already imported through the package, and set aside modules of the
+        # same names from other directories
+        hidden = {}
+        for file_name in os.listdir(directory):
+            bare, ext = os.path.splitext(file_name)
+            if ext != '.py':
+                continue
+            if bare in sys.modules:
+                hidden[bare] = sys.modules.pop(bare)
+            if prefix + bare in sys.modules:
+                sys.modules[bare] = sys.modules[prefix + bare]
+        sys.path.insert(0, directory)
+        try:
+            super().exec_module(module)
+        finally:
+            sys.path.remove(directory)
+
+            # register the directory's modules with the package and restore
+            # the bare names
+            for file_name in os.listdir(directory):
+                bare, ext = os.path.splitext(file_name)
+                if ext != '.py' or bare not in sys.modules:
+                    continue
+                loaded = sys.modules.pop(bare)
+                if os.path.dirname(os.path.abspath(getattr(loaded, '__file__', None) or '')) == directory:
+                    sys.modules.setdefault(prefix + bare, loaded)
+            sys.modules.update(hidden)
+
+
+class _CourseFinder(importlib.abc.MetaPathFinder):
+    # maps ders.<subpackage>.<module> to <course directory>/<module>.py
+
+    def find_spec(self, fullname, path=None, target=None):
+        parts = fullname.split('.')
+        if parts[0] != __name__ or len(parts) not in (2, 3) or parts[1] not in DIRECTORIES:
+            return None
+        directory = os.path.join(ROOT, DIRECTORIES[parts[1]])
+        if len(parts) == 2:
+            spec = importlib.machinery.ModuleSpec(fullname, None, is_package=True)
+            spec.submodule_search_locations = []
+            return spec
+        file_name = os.path.join(directory, parts[2] + '.py')
+        if not os.path.isfile(file_name):
+            return None
+        return importlib.util.spec_from_file_location(fullname, file_name, loader=_CourseLoader(fullname, file_name))
+
+
+if not any(isinstance(finder, _CourseFinder) for finder in sys.meta_path):
+    sys.meta_path.append(_CourseFinder())
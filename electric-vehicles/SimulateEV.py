@@ -21,31 +21,41 @@ Ensure you install the required libraries before running the script
 # ==============================================================================
 # Required imports
 # ==============================================================================
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
 from generateDrivingPower import generate_driving_power
 from simulatePolicy1 import simulate_policy1
 from simulatePolicy2 import simulate_policy2
 from simulatePolicy3 import simulate_policy3
-from plotEVresults import plot_ev_results
+from discretizeRC import discretize_first_order
 
 # ==============================================================================
 # Graphics settings
 # ==============================================================================
-plt.rc('font', size=24)
-plt.rc('axes', titlesize=24, labelsize=24)
-plt.rc('xtick', labelsize=24)
-plt.rc('ytick', labelsize=24)
-plt.rc('legend', fontsize=12)
-plt.rc('figure', titlesize=24)
-plt.rc('lines', linewidth=3)
+def configure_graphics():
+    # graphics are imported only when plotting, so simulate_ev(to_plot=False)
+    # runs without matplotlib
+    import matplotlib.pyplot as plt
+    plt.rc('font', size=24)
+    plt.rc('axes', titlesize=24, labelsize=24)
+    plt.rc('xtick', labelsize=24)
+    plt.rc('ytick', labelsize=24)
+    plt.rc('legend', fontsize=12)
+    plt.rc('figure', titlesize=24)
+    plt.rc('lines', linewidth=3)
 
 
 def full_stairs(tspan, u, **kwargs):
+    import matplotlib.pyplot as plt
     u = np.append(u, u[-1])
     plt.step(tspan, u, where='post', **kwargs)
 
-def simulate_ev():
+def simulate_ev(to_plot=True):
+    # to_plot, an indicator of whether to plot simulation data and results
+    if to_plot:
+        import matplotlib.pyplot as plt
+        from plotEVresults import plot_ev_results
+        configure_graphics()
 
     # timing
     t0 = 0  # initial time, h
@@ -57,7 +67,7 @@ def simulate_ev():
 
     # EV parameters
     tau = 1600  # self-dissipation time constant, h
-    a = np.exp(-dt/tau)  # discrete-time dynamics parameter
+    a = discretize_first_order(tau, dt)  # discrete-time dynamics parameter
     etac = 0.95  # charging efficiency
     etad = etac  # discharging efficiency
     pc_max = 11.5  # charging capacity, kW
@@ -83,15 +93,16 @@ def simulate_ev():
     pChemLim = [0, np.ceil(np.max(pChemDrive) / 5) * 5]  # chemical power axis limits, kW
 
     # driving power plot with plugged-in periods shaded
-    plt.figure(figsize=(10, 5))
-    plt.fill_between(t[:K], max(pChemLim) * z, color='0.95', step='post')
-    full_stairs(t, pChemDrive, color='k')
-    plt.xlim(t_lim)
-    plt.ylim(pChemLim)
-    plt.ylabel('Power discharged for driving (kW)')
-    plt.xlabel('Hour (0 = midnight)')
-    plt.grid()
-    plt.show()
+    if to_plot:
+        plt.figure(figsize=(10, 5))
+        plt.fill_between(t[:K], max(pChemLim) * z, color='0.95', step='post')
+        full_stairs(t, pChemDrive, color='k')
+        plt.xlim(t_lim)
+        plt.ylim(pChemLim)
+        plt.ylabel('Power discharged for driving (kW)')
+        plt.xlabel('Hour (0 = midnight)')
+        plt.grid()
+        plt.show()
 
 
     # policy 1: when plugged in, charge at maximum until full
@@ -99,14 +110,16 @@ def simulate_ev():
     x1, p1 = simulate_policy1(x0, z, pChemDrive, a, tau, etac, etad, pc_max, x_max)
 
     # plot simulation results
-    plot_ev_results(t, x1, p1, z, x_max, x_min, pc_max, 2)
+    if to_plot:
+        plot_ev_results(t, x1, p1, z, x_max, x_min, pc_max, 2)
 
     # policy 2: when energy gets low, charge at maximum until full
     # simulation
     x2, p2 = simulate_policy2(x0, z, pChemDrive, a, tau, etac, etad, pc_max, x_max, x_min)
 
     # plot simulation results
-    plot_ev_results(t, x2, p2, z, x_max, x_min, pc_max, 3)
+    if to_plot:
+        plot_ev_results(t, x2, p2, z, x_max, x_min, pc_max, 3)
 
     # policy 3: when energy gets low, charge at constant power to meet deadline
     # parameters
@@ -117,9 +130,12 @@ def simulate_ev():
     x3, p3 = simulate_policy3(x0, z, pChemDrive, a, tau, etac, etad, pc_max, x_max, x_min, t, h_deadline, x_star)
 
     # plot simulation results
-    plot_ev_results(t, x3, p3, z, x_max, x_min, pc_max, 4)
+    if to_plot:
+        plot_ev_results(t, x3, p3, z, x_max, x_min, pc_max, 4)
+        plt.show()
 
-    plt.show()
+    return x1, p1, x2, p2, x3, p3
 
 if __name__ == "__main__":
-    simulate_ev()
+    # run with --no-plot to simulate without graphics (e.g. in batch jobs)
+    simulate_ev('--no-plot' not in sys.argv)
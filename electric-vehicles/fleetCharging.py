@@ -0,0 +1,183 @@
+import numpy as np
+from discretizeRC import simulate_segments
+
+
+def simulate_fleet_policy1(x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, aggregate=False, block=4096):
+    """
+    simulateFleetPolicy1 simulates N electric vehicles under the first
+    charging policy (when plugged in, charge at maximum until full).
+
+    See simulateFleet for the inputs and outputs.
+    """
+    return simulate_fleet(1, x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max,
+                          aggregate=aggregate, block=block)
+
+
+def simulate_fleet_policy2(x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_min, aggregate=False,
+                           block=4096):
+    """
+    simulateFleetPolicy2 simulates N electric vehicles under the second
+    charging policy (when plugged in and below minimum charge, charge at
+    maximum until full).
+
+    See simulateFleet for the inputs and outputs.
+    """
+    return simulate_fleet(2, x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_min,
+                          aggregate=aggregate, block=block)
+
+
+def simulate_fleet_policy3(x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_min, t, h_deadline, x_star,
+                           aggregate=False, block=4096):
+    """
+    simulateFleetPolicy3 simulates N electric vehicles under the third
+    charging policy (when plugged in and below minimum charge, charge just
+    fast enough to meet a deadline).
+
+    See simulateFleet for the inputs and outputs.
+    """
+    return simulate_fleet(3, x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_min, t, h_deadline, x_star,
+                          aggregate=aggregate, block=block)
+
+
+def simulate_fleet(policy, x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_min=None, t=None,
+                   h_deadline=None, x_star=None, aggregate=False, block=4096):
+    """
+    simulateFleet simulates N electric vehicles under one of the charging
+    policies of simulatePolicy1, 2 and 3, advancing every vehicle together
+    with vectorized updates of
+
+        x[k+1] = a x[k] + (1 - a) tau p_chem[k].
+
+    Policies (charging at the maximum means the chemical power etac pc_max,
+    reduced at the last step so the battery stops at x_max):
+      1, when plugged in, charge at maximum until full.
+      2, when plugged in and below x_min, enter charging mode; charge at
+          maximum until full or unplugged.
+      3, when plugged in and below x_min, enter charging mode; charge at
+          the constant power that reaches x_star at the next h_deadline
+          (at most the maximum) until x_star is reached or unplugged.
+    The charging modes y2 and y3 are boolean vectors over the vehicles.
+
+    Vehicles are simulated in blocks, with each block's inputs transposed
+    to time-major order so every step reads contiguous rows. Steps at which
+    every vehicle of a block is unplugged involve no decision; they are
+    simulated open-loop by simulateSegments, so a single vehicle (or a
+    small block) costs a Python iteration only while plugged in. Inputs can be
+    compact (e.g. boolean z and float32 p_chem_drive); each block is
+    converted to float64 separately. With aggregate, only the fleet's total
+    charging power and final energies are kept, so memory does not grow
+    with N x K. aggregate can also be a FleetAggregator, which each block's
+    charging powers are pushed into for percentiles and peaks.
+
+    Inputs:
+      policy, the charging policy, 1, 2 or 3
+      x0, the initial chemical energies, kWh (scalar or N x 1)
+      z, the N x K indicators that each vehicle is plugged in
+      p_chem_drive, the N x K chemical powers discharged to drive, kW
+      a, the discrete-time dynamics parameter (scalar or N x 1)
+      tau, the self-dissipation time constant, h (scalar or N x 1)
+      etac, the charging efficiency
+      etad, the discharging efficiency
+      pc_max, the maximum charging electrical powers, kW (scalar or N x 1)
+      x_max, the chemical energy capacities, kWh (scalar or N x 1)
+      x_min, the minimum acceptable chemical energies, kWh (policies 2, 3)
+      t, the K+1 x 1 simulation time span, h (policy 3)
+      h_deadline, the hours of day of the charging deadlines (policy 3)
+      x_star, the desired charges at the deadline, kWh (policy 3)
+      aggregate, an indicator of whether to return fleet totals only, or a
+          FleetAggregator to push the charging powers into (fleet totals
+          are then returned as well)
+      block, the number of vehicles simulated at once
+
+    Outputs:
+      x, the N x K+1 stored chemical energies, kWh (N x 1 final energies
+          with aggregate)
+      p, the N x K electrical charging powers, kW (K x 1 fleet total with
+          aggregate)
+    """
+
+    # dimensions and per-vehicle parameters
+    z = np.atleast_2d(z)
+    p_chem_drive = np.atleast_2d(p_chem_drive)
+    N, K = z.shape
+
+    def per_vehicle(v):
+        return np.broadcast_to(np.asarray(np.nan if v is None else v, dtype=float), (N,))
+    x0, a, tau, pc_max, x_max, x_min, h_deadline, x_star = (
+        per_vehicle(v) for v in (x0, a, tau, pc_max, x_max, x_min, h_deadline, x_star))
+
+    # hours until the next deadline, at each step (policy 3)
+    if policy == 3:
+        dt = t[1] - t[0]  # time step duration, h
+        h = np.mod(np.asarray(t[:K], dtype=float), 24)  # hour of day
+    else:
+        dt, h = None, None
+
+    aggregator = None if isinstance(aggregate, bool) else aggregate  # FleetAggregator to push into
+    if aggregate:
+        x = np.empty(N)
+        p = np.zeros(K)
+    else:
+        x = np.empty((N, K + 1))
+        p = np.empty((N, K))
+    for i in range(0, N, block):
+        v = slice(i, min(i + block, N))
+        zb = np.ascontiguousarray(z[v].T, dtype=bool)  # time-major block
+        pb = np.ascontiguousarray(p_chem_drive[v].T, dtype=float)  # time-major block
+        xb, pb = _simulate_block(policy, x0[v], zb, pb, a[v], tau[v], etac, etad, pc_max[v], x_max[v], x_min[v],
+                                 dt, h, h_deadline[v], x_star[v], aggregator is None and aggregate)
+        if aggregator is not None:
+            aggregator.push(pb.T)
+            xb, pb = xb[-1], pb.sum(axis=1)
+        if aggregate:
+            x[v] = xb
+            p += pb
+        else:
+            x[v] = xb.T
+            p[v] = pb.T
+
+    return x, p
+
+
+def _simulate_block(policy, x0, z, p_chem_drive, a, tau, etac, etad, pc_max, x_max, x_min, dt, h, h_deadline,
+                    x_star, aggregate):
+    # time-major simulation of one block of vehicles
+    K, n = z.shape
+    b = (1 - a) * tau  # stored energy per unit chemical power and step, kWh/kW
+    pc_chem = etac * pc_max  # maximum chemical charging power, kW
+    y = np.zeros(n, dtype=bool)  # indicator of charging mode
+    k_last = -1  # last step with a vehicle plugged in
+    p_out = np.zeros(K) if aggregate else np.zeros((K, n))
+
+    def control(k, xk):
+        nonlocal y, k_last
+        zk = z[k]
+        if k > k_last + 1:
+            y = np.zeros(n, dtype=bool)  # every vehicle was unplugged since the last step
+        k_last = k
+
+        # charging decision
+        if policy == 1:
+            y = zk
+        elif policy == 2:
+            y = zk & ((xk < x_min) | (y & (xk < x_max)))
+        else:
+            y = zk & ((xk < x_min) | (y & (xk < x_star)))
+        p_charge = np.minimum(pc_chem, (x_max - a * xk) / b)  # maximum, or the power that fills the battery, kW
+        if policy == 3:
+            # constant power reaching x_star at the deadline, for the vehicles in charging mode
+            i = np.flatnonzero(y)
+            n_left = np.maximum(np.round(np.mod(h_deadline[i] - h[k], 24) / dt), 1)  # steps to the deadline
+            a_left = a[i] ** n_left
+            p_charge[i] = np.clip((x_star[i] - a_left * xk[i]) / ((1 - a_left) * tau[i]), 0, p_charge[i])
+        p_chem = np.where(y, p_charge, -p_chem_drive[k])  # chemical charging power, kW
+
+        # electrical charging power (none while unplugged), kW
+        pk = np.where(zk, np.maximum(p_chem / etac, etad * p_chem), 0)
+        p_out[k] = pk.sum() if aggregate else pk
+        return p_chem
+
+    # dynamic updates, x[k+1] = a x[k] + b p_chem[k]
+    free = ~z.any(axis=1)  # indicator that every vehicle is unplugged (driving or parked)
+    x, _ = simulate_segments(x0, a, -p_chem_drive, free, control, b)
+    return (x[-1] if aggregate else x), p_out
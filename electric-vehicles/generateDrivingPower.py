@@ -1,17 +1,28 @@
 import numpy as np
 
 
-def generate_driving_power(t, alpha):
+def generate_driving_power(t, alpha, N=None, rng=None):
     """
     generateDrivingPower generates a time series of chemical power discharged
     to drive an electric vehicle.
 
+    Trips are drawn for all vehicles and days at once by sampleTrips. Each
+    trip then discharges alpha times its speed over its time steps (a
+    fraction of a step for the last one). The trips are written in order,
+    one array assignment per trip of the day, so a trip that runs into an
+    earlier one overwrites it, as when trips were written one at a time.
+
     Inputs:
         t: the K+1 vector time span in h
-        alpha: the K vector energy intensity of driving in kWh/km
+        alpha: the K vector energy intensity of driving in kWh/km (or an
+            N x K matrix, one row per vehicle)
+        N: (optional) the number of vehicles
+        rng: (optional) a np.random.Generator or RandomState (default: the
+            global np.random state)
 
     Output:
         p_chem_drive: a K vector of chemical powers discharged to drive in kW
+            (N x K matrix if N is given)
     """
     # timing
     K = len(t) - 1  # number of time steps
@@ -19,42 +30,93 @@ def generate_driving_power(t, alpha):
     nd = K * dt / 24  # number of days in time span
     if nd % 1 != 0:
         raise ValueError('The time span must contain an integer number of days.')
+    nd = int(nd)
+    spd = K // nd  # time steps per day
+
+    # vehicles and energy intensities
+    single = N is None
+    N = 1 if single else N
+    alpha = np.broadcast_to(alpha, (N, K))
+
+    # trips of every vehicle and day
+    k_start, d_trip, s_trip = sample_trips(N, nd, dt, rng)
+    n_steps = _trip_steps(d_trip / s_trip, dt)  # time steps per trip
 
-    # reshape energy intensity
-    alpha = np.reshape(alpha, (int(K / nd), int(nd)))
-
-    # generate discharge powers for driving
-    nt = 3  # number of trips per day
-    p_chem_drive = np.zeros((int(K / nd), int(nd)))  # chemical discharge powers for driving, kW
-    d_trip = np.zeros((nt, int(nd)))  # trip distances, km
-    for j in range(int(nd)):  # day index
-        for i in range(nt):  # trip index
-            # generate trip start time of day
-            h_start = 6 + 14 * np.random.rand()  # trip start time of day, h
-            k_start = int(h_start // dt)  # trip start time of day index
-            while p_chem_drive[k_start, j] > 0:
-                h_start = 6 + 14 * np.random.rand()  # trip start time of day, h
-                k_start = int(h_start // dt)  # trip start time of day index
-
-            # generate trip distance
-            d_trip[i, j] = min(100, np.random.lognormal(1.8, 1.24))  # trip distance, km
-
-            # set trip speed
-            if d_trip[i, j] < 15:
-                s_trip = 40  # short trip speed, km/h
-            else:
-                s_trip = 90  # long trip speed, km/h
-
-            # set trip duration
-            t_trip = d_trip[i, j] / s_trip  # trip duration, h
-
-            # spread trip discharge energy over the appropriate time steps
-            while t_trip > 0:
-                p_chem_drive[k_start, j] = alpha[k_start, j] * s_trip * min(dt, t_trip) / dt
-                t_trip -= min(dt, t_trip)
-                k_start += 1
-
-    # rewrite matrix as stacked vector
-    p_chem_drive = p_chem_drive.flatten('F')
+    # spread trip discharge energy over the appropriate time steps, one trip
+    # of the day at a time
+    p_chem_drive = np.zeros((N, K))  # chemical discharge powers for driving, kW
+    vehicle, day = np.meshgrid(np.arange(N), np.arange(nd), indexing='ij')
+    for i in range(k_start.shape[2]):  # trip index
+        n = n_steps[:, :, i].ravel()
+        step = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)  # step within the trip
+        v = np.repeat(vehicle.ravel(), n)
+        k = np.repeat(day.ravel() * spd + k_start[:, :, i].ravel(), n) + step
+        t_left = np.repeat((d_trip[:, :, i] / s_trip[:, :, i]).ravel(), n) - step * dt  # trip time left, h
+        p_chem_drive[v, k] = alpha[v, k] * np.repeat(s_trip[:, :, i].ravel(), n) * np.minimum(dt, t_left) / dt
 
+    if single:
+        return p_chem_drive[0]
     return p_chem_drive
+
+
+def sample_trips(N, nd, dt, rng=None, nt=3):
+    """
+    sampleTrips draws the start times, distances and speeds of nt daily
+    trips for N vehicles over nd days, as N x nd x nt arrays.
+
+    Trips start between 6 am and 8 pm, at a time step that no earlier trip
+    of the day is still driving in. Instead of redrawing one start time at
+    a time, every conflicting start of a trip index is redrawn together,
+    until none conflict. Distances are lognormal (capped at 100 km);
+    trips shorter than 15 km are driven at 40 km/h and longer ones at
+    90 km/h.
+
+    Inputs:
+        N: the number of vehicles
+        nd: the number of days
+        dt: the time step duration in h
+        rng: (optional) a np.random.Generator or RandomState (default: the
+            global np.random state)
+        nt: the number of trips per day
+
+    Outputs:
+        k_start: the time step of the day at which each trip starts
+        d_trip: the trip distances in km
+        s_trip: the trip speeds in km/h
+    """
+    rng = np.random if rng is None else rng
+    k_start = np.zeros((nt, N * nd), dtype=np.int64)  # one column per vehicle-day
+    k_end = np.zeros((nt, N * nd), dtype=np.int64)  # time step of the day after each trip
+    d_trip = np.zeros((nt, N * nd))  # trip distances, km
+    for i in range(nt):  # trip index
+        # generate trip start times of day, redrawing starts inside earlier trips
+        pending = slice(None)  # vehicle-days without a start time (all, at first)
+        k = (((6 + 14 * rng.random(N * nd)) // dt)).astype(np.int64)  # trip start time of day indices
+        while True:
+            inside = np.zeros(len(k), dtype=bool)
+            for j in range(i):
+                inside |= (k >= k_start[j, pending]) & (k < k_end[j, pending])
+            k_start[i, pending] = k
+            pending = np.arange(N * nd)[pending][inside]
+            if len(pending) == 0:
+                break
+            k = ((6 + 14 * rng.random(len(pending))) // dt).astype(np.int64)
+
+        # generate trip distances
+        d_trip[i] = np.minimum(100, rng.lognormal(1.8, 1.24, N * nd))  # trip distances, km
+        k_end[i] = k_start[i] + _trip_steps(d_trip[i] / _trip_speed(d_trip[i]), dt)
+
+    shape = (nt, N, nd)
+    return (np.moveaxis(k_start.reshape(shape), 0, 2), np.moveaxis(d_trip.reshape(shape), 0, 2),
+            np.moveaxis(_trip_speed(d_trip).reshape(shape), 0, 2))
+
+
+def _trip_speed(d_trip):
+    # short trip speed 40 km/h, long trip speed 90 km/h
+    return np.where(d_trip < 15, 40, 90)
+
+
+def _trip_steps(t_trip, dt):
+    # number of time steps a trip of duration t_trip (h) drives in, allowing
+    # for rounding in t_trip / dt
+    return np.maximum(np.ceil(t_trip / dt - 1e-9), 1).astype(np.int64)
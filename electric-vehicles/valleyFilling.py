@@ -0,0 +1,116 @@
+import numpy as np
+from discretizeRC import first_order_response
+
+
+def valley_filling(x0, z, p_chem_drive, a, tau, etac, pc_max, x_star, base, sweeps=10, tol=1e-3):
+    """
+    valleyFilling schedules the charging of a fleet of electric vehicles to
+    flatten the aggregate load (base load plus charging). Each time a
+    vehicle is plugged in (a session), it charges to x_star by the time it
+    unplugs, if its maximum power allows; the charging powers minimize the
+    sum of squared aggregate loads,
+
+        minimize    sum_k (base[k] + sum_i p[i, k])^2
+        subject to  0 <= p[i, k] <= pc_max[i] z[i, k]
+                    x[i] = x_star[i] at the end of each session,
+
+    with the battery dynamics of simulateFleet,
+
+        x[k+1] = a x[k] + (1 - a) tau (etac p[k] - p_chem_drive[k]).
+
+    Vehicles take turns (Gauss-Seidel best response, as in decentralized
+    valley filling): each session is rescheduled against the load of
+    everything else, which cannot increase the objective. A session's best
+    response fills the valleys of that load to a common level,
+
+        p[k] = clip(L w[k] - g[k], 0, pc_max),
+
+    with g the load of everything else and w[k] the chemical energy at
+    unplugging per unit of power at step k. The level L is found exactly by
+    sorting the 2n levels at which each step starts and stops charging and
+    walking the piecewise-linear stored energy, in O(n log n) for a session
+    of n steps, rather than by a generic linear or quadratic program. The
+    sweeps over the fleet stop when no power changes by more than tol.
+
+    Inputs:
+      x0, the initial chemical energies, kWh (scalar or N x 1)
+      z, the N x K indicators that each vehicle is plugged in
+      p_chem_drive, the N x K chemical powers discharged to drive, kW
+      a, the discrete-time dynamics parameter (scalar or N x 1)
+      tau, the self-dissipation time constant, h (scalar or N x 1)
+      etac, the charging efficiency
+      pc_max, the maximum charging electrical powers, kW (scalar or N x 1)
+      x_star, the desired charges at unplugging, kWh (scalar or N x 1)
+      base, the K x 1 base load, kW
+      sweeps, the maximum number of sweeps over the fleet
+      tol, the largest change of any power at convergence, kW
+
+    Outputs:
+      x, the N x K+1 stored chemical energies, kWh
+      p, the N x K electrical charging powers, kW
+    """
+
+    # dimensions and per-vehicle parameters
+    z = np.atleast_2d(z)
+    p_chem_drive = np.atleast_2d(p_chem_drive)
+    N, K = z.shape
+    x0, a, tau, pc_max, x_star = (np.broadcast_to(np.asarray(v, dtype=float), (N,))
+                                  for v in (x0, a, tau, pc_max, x_star))
+    b = (1 - a) * tau  # stored energy per unit chemical power and step, kWh/kW
+
+    # sessions: runs of plugged-in steps, in order of vehicle then time
+    edges = np.diff(np.pad(np.asarray(z, dtype=np.int8), ((0, 0), (1, 1))), axis=1)
+    vehicle, start = np.nonzero(edges == 1)
+    stop = np.nonzero(edges == -1)[1]
+    first = np.searchsorted(vehicle, np.arange(N + 1))  # each vehicle's first session
+
+    # sweeps of best responses
+    p = np.zeros((N, K))  # electrical charging power, kW
+    total = np.array(base, dtype=float)  # aggregate load, kW
+    for sweep in range(sweeps):
+        change = 0.0  # largest change of any power, kW
+        for i in range(N):
+            xk, k = x0[i], 0  # stored energy at step k
+            for j in range(first[i], first[i + 1]):
+                s, n = start[j], stop[j] - start[j]
+
+                # drive and park until plugging in, then charge to x_star
+                xk = first_order_response(xk, a[i], -p_chem_drive[i, k:s], b[i])[-1]
+                decay = a[i] ** np.arange(n - 1, -1, -1)  # decay from each step to unplugging
+                w = b[i] * etac * decay  # stored energy at unplugging per kW, kWh/kW
+                g = total[s:s + n] - p[i, s:s + n]  # load of everything else, kW
+                p_new = _water_fill(g, pc_max[i], w, x_star[i] - a[i] * decay[0] * xk)
+
+                change = max(change, np.abs(p_new - p[i, s:s + n]).max())
+                p[i, s:s + n] = p_new
+                total[s:s + n] = g + p_new
+                xk = a[i] * decay[0] * xk + w @ p_new
+                k = s + n
+        if change <= tol:
+            break
+
+    # stored energies under the schedule
+    p_chem = np.where(z, etac * p, -p_chem_drive)  # chemical charging power, kW
+    x = first_order_response(x0, a, p_chem.T, b).T
+    return x, p
+
+
+def _water_fill(g, u, w, need):
+    # powers 0 <= p <= u minimizing sum (g + p)^2 with sum w p = need, or
+    # the nearest feasible powers: p = clip(L w - g, 0, u) for a level L
+    n = len(g)
+    if need <= 0:
+        return np.zeros(n)
+    if u * w.sum() <= need:
+        return np.full(n, float(u))
+
+    # stored energy as a function of the level is piecewise linear, with
+    # slope sum w^2 over the steps that are charging but not saturated
+    levels = np.concatenate((g / w, (g + u) / w))  # levels at which steps start and stop charging
+    order = np.argsort(levels, kind='stable')
+    levels = levels[order]
+    slope = np.cumsum(np.concatenate((w ** 2, -w ** 2))[order])
+    energy = np.concatenate(([0], np.cumsum(slope[:-1] * np.diff(levels))))  # stored energy at each level, kWh
+    j = np.searchsorted(energy, need) - 1  # need falls between levels j and j+1
+    level = levels[j] + (need - energy[j]) / slope[j]
+    return np.clip(level * w - g, 0, u)
@@ -20,8 +20,8 @@ Ensure you install the required libraries before running the script:
 # Required imports
 # ==============================================================================
 
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
 from nonlinearClimateSim import nonlinear_climate_sim
 from linearizedClimateSim import linearized_climate_sim
 from k2c import k2c
@@ -29,13 +29,18 @@ from k2c import k2c
 # ==============================================================================
 # graphics settings
 # ==============================================================================
+# run with --no-plot to simulate without graphics (e.g. in batch jobs)
+to_plot = '--no-plot' not in sys.argv  # indicator of whether to plot results
 
-plt.rc('font', size=20)  # Default font size for all text
-plt.rc('axes', titlesize=20, labelsize=20)  # Font size for axes titles and labels
-plt.rc('xtick', labelsize=20)  # Font size for x-axis tick labels
-plt.rc('ytick', labelsize=20)  # Font size for y-axis tick labels
-plt.rc('legend', fontsize=15)  # Font size for legend
-plt.rc('figure', titlesize=20)  # Font size for figure titles
+if to_plot:
+    import matplotlib.pyplot as plt
+
+    plt.rc('font', size=20)  # Default font size for all text
+    plt.rc('axes', titlesize=20, labelsize=20)  # Font size for axes titles and labels
+    plt.rc('xtick', labelsize=20)  # Font size for x-axis tick labels
+    plt.rc('ytick', labelsize=20)  # Font size for y-axis tick labels
+    plt.rc('legend', fontsize=15)  # Font size for legend
+    plt.rc('figure', titlesize=20)  # Font size for figure titles
 
 # ==============================================================================
 # Input Data
@@ -81,28 +86,29 @@ y = 2022 + t / (365 * 24 * 3600)  # Year
 c_plot = np.arange(200, 501)
 eps_values = eps0 + m * c_plot
 temp_values = ((1 - alpha) * S / (4 * sigma * (1 - (eps0 + m * c_plot) / 2)))**(1 / 4)
-fig, ax1 = plt.subplots(figsize=(10, 6))
-ax1.plot(c_plot, eps_values, label="Atmospheric emissivity", color="blue")
-ax1.set_xlabel("Atmospheric CO$_2$ concentration (ppm)")
-ax1.set_ylabel("Atmospheric emissivity", color="blue")
-ax1.tick_params(axis="y", labelcolor="blue")
-ax1.set_ylim(0.6, 0.8)
-
-#surface temperature vs. CO2 concentration
-ax2 = ax1.twinx()
-ax2.plot(c_plot, k2c(temp_values), label="Global average surface temperature", color="orange")
-ax2.set_ylabel("Global average surface temperature (°C)", color="orange")
-ax2.tick_params(axis="y", labelcolor="orange")
-ax2.set_ylim(12.5, 16)  # Match MATLAB y-axis range for temperature
-
-#annotation
-lw = 2
-ax1.axvline(c1, linestyle="--", color="black", linewidth=lw)
-ax1.text(c1, 0.61, "1880–1900:\n294 ppm", rotation=90, verticalalignment="bottom", horizontalalignment="center")
-ax1.axvline(c2, linestyle="--", color="black", linewidth=lw)
-ax1.text(c2, 0.61, "2022:\n419 ppm", rotation=90, verticalalignment="bottom", horizontalalignment="center")
-ax1.grid(visible=True, linestyle="--", linewidth=0.5)
-fig.tight_layout()
+if to_plot:
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+    ax1.plot(c_plot, eps_values, label="Atmospheric emissivity", color="blue")
+    ax1.set_xlabel("Atmospheric CO$_2$ concentration (ppm)")
+    ax1.set_ylabel("Atmospheric emissivity", color="blue")
+    ax1.tick_params(axis="y", labelcolor="blue")
+    ax1.set_ylim(0.6, 0.8)
+
+    #surface temperature vs. CO2 concentration
+    ax2 = ax1.twinx()
+    ax2.plot(c_plot, k2c(temp_values), label="Global average surface temperature", color="orange")
+    ax2.set_ylabel("Global average surface temperature (°C)", color="orange")
+    ax2.tick_params(axis="y", labelcolor="orange")
+    ax2.set_ylim(12.5, 16)  # Match MATLAB y-axis range for temperature
+
+    #annotation
+    lw = 2
+    ax1.axvline(c1, linestyle="--", color="black", linewidth=lw)
+    ax1.text(c1, 0.61, "1880–1900:\n294 ppm", rotation=90, verticalalignment="bottom", horizontalalignment="center")
+    ax1.axvline(c2, linestyle="--", color="black", linewidth=lw)
+    ax1.text(c2, 0.61, "2022:\n419 ppm", rotation=90, verticalalignment="bottom", horizontalalignment="center")
+    ax1.grid(visible=True, linestyle="--", linewidth=0.5)
+    fig.tight_layout()
 
 # ==============================================================================
 # Nominal Simulation
@@ -133,29 +139,30 @@ alpha_t = alpha * (1 + 0.01 * np.sin(y[:K])) # Perturbed albedo
 wt = (1 - alpha_t) * S * np.pi * R**2 / C
 x = nonlinear_climate_sim(t, x0, u, wt, beta) # global average surface temperature, K
 
-fig, axs = plt.subplots(3, 1, figsize=(10, 12))
-fig.subplots_adjust(hspace=0.5)
-
-# First subplot: Atmospheric emissivity
-axs[0].step(y[:K], u_hat, linestyle="--", color="k", label="Nominal")
-axs[0].step(y[:K], u, color="b", label="True")
-axs[0].set_ylabel("Atmospheric\nemissivity\n$u(t)$")
-axs[0].legend(loc="upper left")
-
-# Second subplot: Atmospheric albedo
-axs[1].step(y[:K], alpha_hat, linestyle="--", color="k", label="Nominal")
-axs[1].step(y[:K], alpha_t, color="b", label="True")
-axs[1].set_ylabel("Atmospheric\nalbedo\n$\\alpha(t)$")
-axs[1].legend(loc="upper left")
-
-# Third subplot: Surface temperature
-axs[2].plot(y, k2c(x_hat), linestyle="--", color="k", label="Nominal")
-axs[2].plot(y, k2c(x), color="b", label="True")
-axs[2].plot(y, k2c(linearized_climate_sim(t, x_hat, u_hat, u - u_hat, wt - wt_hat, beta)),
-            marker="o", linestyle="none", color="magenta", label="Linearized")
-axs[2].set_ylabel("Surface\ntemperature\n$x(t)$ (°C)")
-axs[2].set_xlabel("Year")
-axs[2].legend(loc="upper left")
+if to_plot:
+    fig, axs = plt.subplots(3, 1, figsize=(10, 12))
+    fig.subplots_adjust(hspace=0.5)
+
+    # First subplot: Atmospheric emissivity
+    axs[0].step(y[:K], u_hat, linestyle="--", color="k", label="Nominal")
+    axs[0].step(y[:K], u, color="b", label="True")
+    axs[0].set_ylabel("Atmospheric\nemissivity\n$u(t)$")
+    axs[0].legend(loc="upper left")
+
+    # Second subplot: Atmospheric albedo
+    axs[1].step(y[:K], alpha_hat, linestyle="--", color="k", label="Nominal")
+    axs[1].step(y[:K], alpha_t, color="b", label="True")
+    axs[1].set_ylabel("Atmospheric\nalbedo\n$\\alpha(t)$")
+    axs[1].legend(loc="upper left")
+
+    # Third subplot: Surface temperature
+    axs[2].plot(y, k2c(x_hat), linestyle="--", color="k", label="Nominal")
+    axs[2].plot(y, k2c(x), color="b", label="True")
+    axs[2].plot(y, k2c(linearized_climate_sim(t, x_hat, u_hat, u - u_hat, wt - wt_hat, beta)),
+                marker="o", linestyle="none", color="magenta", label="Linearized")
+    axs[2].set_ylabel("Surface\ntemperature\n$x(t)$ (°C)")
+    axs[2].set_xlabel("Year")
+    axs[2].legend(loc="upper left")
 
 # ==============================================================================
 # linearized simulation
@@ -174,12 +181,13 @@ x_lin = linearized_climate_sim(t, x_hat, u_hat, du, dwt, beta)  #  Global averag
 x_lin_celsius = k2c(x_lin)
 
 # Error plot
-plt.figure(3, figsize=(10, 6))
-plt.plot(y, x_lin_celsius - k2c(x), "k")  # Difference between linearized and true
-plt.ylabel("Prediction error $x^{\\rm lin}(t) - x(t)$ ($^\circ$C)")
-plt.xlabel("Year")
-plt.xlim([y[0], y[-1]])
-plt.grid(visible=True, linestyle="--", linewidth=0.5)
-plt.tight_layout()
-plt.pause(0.001)
-plt.show()
+if to_plot:
+    plt.figure(3, figsize=(10, 6))
+    plt.plot(y, x_lin_celsius - k2c(x), "k")  # Difference between linearized and true
+    plt.ylabel("Prediction error $x^{\\rm lin}(t) - x(t)$ ($^\circ$C)")
+    plt.xlabel("Year")
+    plt.xlim([y[0], y[-1]])
+    plt.grid(visible=True, linestyle="--", linewidth=0.5)
+    plt.tight_layout()
+    plt.pause(0.001)
+    plt.show()
@@ -0,0 +1,107 @@
+import numpy as np
+from discretizeRC import discretize_first_order
+
+
+def battery_dispatch(p_net, dt, pi_buy, pi_sell, x_max, pc_max, pd_max=None, tau=1600, etac=0.95, etad=0.95,
+                     x0=None, horizon=None):
+    """
+    batteryDispatch computes the cost-minimizing dispatch of a behind-the-
+    meter battery. The battery's stored energy evolves as in the electric
+    vehicle code,
+
+        x[k+1] = a x[k] + (1 - a) tau (etac pc[k] - pd[k] / etad),
+
+    with a = exp(-dt/tau), charging power pc and discharging power pd. The
+    household buys max(g, 0) and sells max(-g, 0) at grid power
+    g = p_net + pc - pd, so with pi_buy >= pi_sell the dispatch is a linear
+    program.
+
+    Each time step only couples to the next one, so the constraint matrix
+    is banded: it is assembled from diagonals in sparse form (4 K variables,
+    K equality and K inequality rows) and solved by HiGHS, without ever
+    forming a dense K x K matrix. The full year is solved at once by
+    default. With horizon given, the year is solved as a sequence of
+    overlapping windows instead (rolling horizon): each window looks ahead
+    horizon steps from the current state, and its first half is kept.
+
+    Input:
+      p_net, the K x 1 net demand (demand minus solar supply), kW
+      dt, the time step, h
+      pi_buy, the price of energy bought, $/kWh (scalar or K x 1)
+      pi_sell, the price of energy sold, $/kWh (scalar or K x 1,
+          pi_sell <= pi_buy)
+      x_max, the battery's energy capacity, kWh
+      pc_max, the maximum charging power, kW
+      pd_max, the maximum discharging power, kW (default: pc_max)
+      tau, the self-dissipation time constant, h
+      etac, the charging efficiency
+      etad, the discharging efficiency
+      x0, the initial stored energy, kWh (default: x_max/2); the stored
+          energy at the end is at least x0
+      horizon, (optional) the number of steps per rolling-horizon window
+
+    Output:
+      x, the (K+1) x 1 stored energy, kWh
+      p_batt, the K x 1 battery electric power, kW (positive charging)
+      cost, the electricity cost with the battery, $
+    """
+
+    p_net = np.asarray(p_net, dtype=float)
+    K = len(p_net)
+    pi_buy = np.broadcast_to(np.asarray(pi_buy, dtype=float), (K,))
+    pi_sell = np.broadcast_to(np.asarray(pi_sell, dtype=float), (K,))
+    pd_max = pc_max if pd_max is None else pd_max
+    x0 = x_max / 2 if x0 is None else x0
+    a = discretize_first_order(tau, dt)  # discrete-time dynamics parameter
+    b = (1 - a) * tau  # stored energy per unit chemical power, kWh/kW
+
+    x = np.empty(K + 1)
+    x[0] = x0
+    p_batt = np.empty(K)
+    step = K if horizon is None else max(1, horizon // 2)
+    for k in range(0, K, step):
+        # window of steps to optimize and the steps to keep
+        n = K - k if horizon is None else min(horizon, K - k)
+        keep = min(step, K - k)
+        xw, pw = _dispatch_window(p_net[k:k + n], dt, pi_buy[k:k + n], pi_sell[k:k + n], a, b, x_max, pc_max,
+                                  pd_max, etac, etad, x[k], x0 if k + n == K else 0)
+        x[k + 1:k + keep + 1] = xw[1:keep + 1]
+        p_batt[k:k + keep] = pw[:keep]
+
+    g = p_net + p_batt  # grid power, kW
+    cost = np.sum(pi_buy * np.maximum(g, 0) - pi_sell * np.maximum(-g, 0)) * dt
+    return x, p_batt, cost
+
+
+def _dispatch_window(p_net, dt, pi_buy, pi_sell, a, b, x_max, pc_max, pd_max, etac, etad, x_start, x_end):
+    from scipy import sparse
+    from scipy.optimize import linprog
+
+    # variables: pc (K), pd (K), sold (K), x[1..K] (K); the energy bought,
+    # p_net + pc - pd + sold, is only constrained to be nonnegative
+    K = len(p_net)
+    I = sparse.identity(K, format='csr')
+    shift = sparse.diags(np.ones(K - 1), -1, shape=(K, K), format='csr')  # x[k] from x[k+1]
+    zero = sparse.csr_matrix((K, K))
+
+    # bought >= 0: -pc + pd - sold <= p_net
+    A_ub = sparse.hstack((-I, I, -I, zero), format='csc')
+    # dynamics: x[k+1] - a x[k] - b (etac pc[k] - pd[k] / etad) = 0 (x[0] is known)
+    A_eq = sparse.hstack((-b * etac * I, (b / etad) * I, zero, I - a * shift), format='csc')
+    b_eq = np.zeros(K)
+    b_eq[0] = a * x_start
+
+    cost = np.concatenate((pi_buy * dt, -pi_buy * dt, (pi_buy - pi_sell) * dt, np.zeros(K)))
+    bounds = np.zeros((4 * K, 2))
+    bounds[:K, 1] = pc_max
+    bounds[K:2 * K, 1] = pd_max
+    bounds[2 * K:3 * K, 1] = np.inf
+    bounds[3 * K:, 1] = x_max
+    bounds[-1, 0] = min(x_end, x_max)
+    result = linprog(cost, A_ub=A_ub, b_ub=p_net, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method='highs')
+    if result.status != 0:
+        raise RuntimeError(f'battery dispatch failed: {result.message}')
+
+    z = result.x
+    x = np.concatenate(([x_start], z[3 * K:]))
+    return x, z[:K] - z[K:2 * K]
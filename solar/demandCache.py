@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import os
+
+import numpy as np
+from generateElectricityDemand import generate_electricity_demand
+
+logger = logging.getLogger(__name__)
+
+# hit/miss statistics since the module was loaded
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# modules whose source determines the demand (generateElectricityDemand and
+# everything it imports from this directory)
+_SOURCES = ('generateElectricityDemand.py', 'loadElectricity.py', 'resamplingPlan.py', 'discretizeRC.py')
+
+
+def cached_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, to_plot, groups=None,
+                              seed=0, cache_dir=None, max_bytes=2 ** 30):
+    """
+    cachedElectricityDemand returns the output of generate_electricity_demand
+    from an on-disk cache, so scripts that rerun with different solar or
+    tariff parameters do not redo the annual building simulation.
+
+    Results are stored as .npy files named by a digest of everything that
+    determines them: the electricity file's path, size and modification
+    time, the source of generateElectricityDemand.py and of the modules it
+    imports (_SOURCES), the time span, the building parameters, the
+    weather arrays and the random seed. A hit is returned memory-mapped
+    and read-only. Each hit refreshes the file's modification time; when
+    the cache grows beyond max_bytes, the least recently used files are
+    deleted. Hits, misses and evictions are logged at the INFO level of
+    the demandCache logger.
+
+    Input:
+      t_span, electricity_file, Af, N, theta, total_horizontal, to_plot,
+          groups, as in generate_electricity_demand. The demand plots need
+          the full simulation, so with to_plot the demand is always
+          regenerated (and stored); callers that only plot the demand's
+          consequences should pass to_plot=False to reuse the cache.
+      seed, the seed of the thermal noise; None disables the cache, since
+          the result is then random
+      cache_dir, the directory to store results in (default: a
+          .demand-cache directory next to the electricity file)
+      max_bytes, the cache size limit, bytes
+
+    Output:
+      p, the K x 1 (or K x n) total electricity demand, kW
+    """
+
+    # a random result cannot be reused
+    if seed is None:
+        return generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, to_plot, groups)
+
+    # digest of the inputs
+    path = os.path.abspath(electricity_file)
+    stat = os.stat(path)
+    named_groups = groups is None or isinstance(groups, str)
+    fingerprint = f'{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{seed}\0{groups if named_groups else ""}'
+    digest = hashlib.sha1(fingerprint.encode())
+    for source in _SOURCES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), source), 'rb') as f:
+            digest.update(f.read())
+    arrays = [np.asarray(t_span, dtype='datetime64[ns]').view(np.int64)]
+    arrays += [np.asarray(x, dtype=float) for x in (Af, N, theta, total_horizontal)]
+    if not named_groups:
+        arrays.append(np.asarray(groups, dtype=np.int64))
+    for x in arrays:
+        digest.update(f'{x.shape}'.encode())
+        digest.update(np.ascontiguousarray(x))
+    key = digest.hexdigest()[:20]
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), '.demand-cache')
+    entry = os.path.join(cache_dir, key + '.npy')
+
+    # reuse a stored result
+    if not to_plot and os.path.isfile(entry):
+        _stats['hits'] += 1
+        logger.info('demand cache hit: %s', key)
+        os.utime(entry)  # mark as recently used
+        return np.load(entry, mmap_mode='r')
+
+    # simulate and store, publishing the file with an atomic rename
+    _stats['misses'] += 1
+    logger.info('demand cache miss: %s', key)
+    p = generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, to_plot, groups,
+                                    rng=np.random.RandomState(seed))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{entry}.tmp-{os.getpid()}.npy'
+    np.save(tmp, p)
+    os.replace(tmp, entry)
+    _evict(cache_dir, max_bytes, keep=entry)
+    return np.load(entry, mmap_mode='r')
+
+
+def demand_cache_info(cache_dir):
+    """
+    demandCacheInfo reports the hit/miss statistics of the demand cache and
+    the size of a cache directory.
+
+    Input:
+      cache_dir, the cache directory
+
+    Output:
+      info, a dict with hits, misses, evictions, size (number of entries)
+          and nbytes
+    """
+    entries = _entries(cache_dir)
+    return {**_stats, 'size': len(entries), 'nbytes': sum(nbytes for _, _, nbytes in entries)}
+
+
+def demand_cache_clear(cache_dir):
+    """
+    demandCacheClear deletes every stored demand in a cache directory and
+    resets the statistics.
+
+    Input:
+      cache_dir, the cache directory
+    """
+    for file_name, _, _ in _entries(cache_dir):
+        os.remove(file_name)
+    _stats.update(hits=0, misses=0, evictions=0)
+
+
+def _entries(cache_dir):
+    # (file name, last use, bytes) of the stored results, oldest first
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for name in os.listdir(cache_dir):
+        file_name = os.path.join(cache_dir, name)
+        if name.endswith('.npy') and '.tmp-' not in name:
+            stat = os.stat(file_name)
+            entries.append((file_name, stat.st_mtime_ns, stat.st_size))
+    return sorted(entries, key=lambda entry: entry[1])
+
+
+def _evict(cache_dir, max_bytes, keep):
+    # delete least recently used results until the cache fits
+    entries = _entries(cache_dir)
+    total = sum(nbytes for _, _, nbytes in entries)
+    for file_name, _, nbytes in entries:
+        if total <= max_bytes:
+            break
+        if file_name == keep:
+            continue
+        try:
+            os.remove(file_name)
+        except OSError:
+            continue
+        total -= nbytes
+        _stats['evictions'] += 1
+        logger.info('demand cache eviction: %s', os.path.basename(file_name))
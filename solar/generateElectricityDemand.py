@@ -1,46 +1,74 @@
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from importElectricty import import_electricity  # Assuming this function exists
+from loadElectricity import load_electricity
+from resamplingPlan import replace_year
+from discretizeRC import discretize_1r1c, simulate_segments
 
-import matplotlib.dates as mdates
 
-def generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, to_plot):
+def generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, to_plot, groups=None,
+                                rng=None):
     # generateElectricityDemand generates an electricity demand profile for a
     # building, including heating/cooling equipment and everything else, over a
     # given time span.
 
+    # Many buildings can be simulated at once by passing groups, a list of
+    # MFRED apartment group indices (or 'all'). Each building is then one
+    # column of a K x n state: groups, Af and N are broadcast together, so
+    # e.g. groups=[21, 21], Af=[100, 300] gives two floor-area variants of
+    # one plug power profile. The time loop updates all columns together.
+
     # Input:
     #   t_span, the K x 1 time span as a datetime object
     #   electricity_file, a string containing the electricity data file name
-    #   Af, the floor area, m^2
-    #   N, the number of stories
+    #   Af, the floor area, m^2 (scalar or n x 1)
+    #   N, the number of stories (scalar or n x 1)
     #   theta, the K x 1 outdoor temperature, C
     #   total_horizontal, the K x 1 total horizontal solar irradiance, kW/m^2
     #   to_plot, an indicator of whether to plot simulation data and results
+    #       (plots show the first building)
+    #   groups, the n x 1 MFRED apartment group indices in 0, ..., 25, or
+    #       'all' (default: a single building using group 22 of 26)
+    #   rng, (optional) a np.random.RandomState or Generator for the thermal
+    #       noise (default: the global np.random state)
 
     # Output:
-    #   p, a K x 1 vector of total electricity demand, kW
+    #   p, a K x 1 vector of total electricity demand, kW (K x n matrix if
+    #       groups is given)
+
+    # graphics are imported only when needed
+    if to_plot:
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
 
     # timing
     K = len(t_span)  # number of time steps
     dt = (t_span[1] - t_span[0]).total_seconds() / 3600  # time step, h
 
-    # electricity data import
-    t_elec = t_span.copy()
-    t_elec = t_elec.map(lambda t: t.replace(year=2019))  # electricity time span (data are from 2019)
-    plug_powers = import_electricity(electricity_file, t_elec)  # 'everything else' electricity data import
-    plug_powers = plug_powers * (0.005 * Af / np.mean(plug_powers, axis=0)) # plug powers rescaled by floor area to 5 W/m^2, kW
+    # buildings, one per column
+    i_power = 21  # index of power profile (MFRED apartment group 22 of 26)
+    single = groups is None
+    if single:
+        groups = [i_power]
+    elif isinstance(groups, str) and groups == 'all':
+        groups = np.arange(26)
+    groups, Af, N = np.broadcast_arrays(np.atleast_1d(groups), np.atleast_1d(np.asarray(Af, dtype=float)),
+                                        np.atleast_1d(np.asarray(N, dtype=float)))
+    n = len(groups)  # number of buildings
+
+    # electricity data import, reading each distinct profile once
+    t_elec = replace_year(t_span, 2019)  # electricity time span (data are from 2019)
+    unique_groups, i_group = np.unique(groups, return_inverse=True)
+    plug_power = load_electricity(electricity_file, t_elec, groups=unique_groups, dtype=float)[:, i_group]  # 'everything else' electricity data import
+    plug_power = plug_power * (0.005 * Af / np.mean(plug_power, axis=0)) # plug power rescaled by floor area to 5 W/m^2, kW
 
 
     # 1R1C building model parameters
     C = 0.0125 * Af  # air thermal capacitance, kWh/C
     R = 1 / (0.016 * np.sqrt(N * Af))  # indoor-outdoor thermal resistance, C/kW
-    a = np.exp(-dt / (R * C))  # discrete-time dynamics parameter
+    a = np.array([discretize_1r1c(Ri, Ci, dt) for Ri, Ci in zip(R, C)])  # discrete-time dynamics parameter
 
     # indoor temperature setpoint
-    is_winter = (t_span <= pd.Timestamp("2022-04-15")) | (t_span >= pd.Timestamp("2022-10-15"))  # indicator of heating season
-    is_summer = (t_span >= pd.Timestamp("2022-05-01")) & (t_span <= pd.Timestamp("2022-09-30"))  # indicator of cooling season
+    is_winter = (t_span <= np.datetime64("2022-04-15")) | (t_span >= np.datetime64("2022-10-15"))  # indicator of heating season
+    is_summer = (t_span >= np.datetime64("2022-05-01")) & (t_span <= np.datetime64("2022-09-30"))  # indicator of cooling season
     T_set = np.full(K, 21)  # indoor temperature setpoint, C
     T_set[is_summer] = 25  # cooling temperature setpoint, C
 
@@ -71,19 +99,19 @@ def generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_ho
 
 
     # exogenous thermal power
-    i_power = plug_powers.shape[1] - 5 # index of power profile
     c = np.full(K, 0.8)  # solar heat gain coefficient
     c[is_summer] = 0.5  # lower SHGC in summer to emulate shading
 
-    qe = (plug_powers[:, i_power] + 0.19 * np.sqrt(N * Af) * c * total_horizontal
-          + 0.5 + (0.25 / 3) * np.random.randn(K))  # from everything else
+    rng = np.random if rng is None else rng
+    qe = (plug_power + 0.19 * np.sqrt(N * Af) * (c * total_horizontal)[:, None]
+          + 0.5 + (0.25 / 3) * rng.standard_normal((K, n)))  # from everything else
 
     # exogenous thermal power plot
     if to_plot:
         plt.figure(2, figsize=(8, 6))
         plots = [
-            (plug_powers[:, i_power], 'Plug\npower (kW)'),
-            (qe, 'Exogenous thermal\npower (kW)')
+            (plug_power[:, 0], 'Plug\npower (kW)'),
+            (qe[:, 0], 'Exogenous thermal\npower (kW)')
         ]
 
         for i, (y_data, ylabel) in enumerate(plots, 1):
@@ -95,45 +123,43 @@ def generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_ho
             ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
             ax.grid(True)
             if i == 2:
-                ax.text(t_span[-1], min(qe) - 3, '2022', fontsize=16, ha='right', va='center', fontname='serif')
+                ax.text(t_span[-1], min(qe[:, 0]) - 3, '2022', fontsize=16, ha='right', va='center', fontname='serif')
 
 
     # heat pump sizing
     kd = np.argmin(np.abs(theta - np.quantile(theta, 0.01)))  # time index of design condition
     p_max = 1.2 * ((T_set[kd] - theta[kd]) / R - qe[kd]) / eta[kd]  # heat pump electric power capacity, kW
-    qc_max = np.zeros(K)  # maximum heat pump thermal power, kW
-    qc_max[is_winter] = p_max * eta[is_winter]  # nonzero heating capacity in winter
-    qc_min = np.zeros(K)  # minimum heat pump thermal power, kW
-    qc_min[is_summer] = p_max * eta[is_summer]  # nonzero cooling capacity in summer
+    qc_max = np.zeros((K, n))  # maximum heat pump thermal power, kW
+    qc_max[is_winter] = np.outer(eta[is_winter], p_max)  # nonzero heating capacity in winter
+    qc_min = np.zeros((K, n))  # minimum heat pump thermal power, kW
+    qc_min[is_summer] = np.outer(eta[is_summer], p_max)  # nonzero cooling capacity in summer
 
     # data storage
-    T = np.zeros(K + 1)  # indoor temperature, C
-    T[0] = T_set[0]  # initial state, C
-    qc = np.zeros(K)  # heat pump thermal power, kW
+    qc = np.zeros((K, n))  # heat pump thermal power, kW
 
-    # thermal simulation
-    for k in range(K):
+    def control(k, T_k):
         # thermal load to exactly track setpoint
-        lk = ((T_set[min(k + 1, K - 1)] - a * T[k]) / (1 - a) - theta[k]) / R - qe[k]  # thermal load, kW
+        lk = ((T_set[min(k + 1, K - 1)] - a * T_k) / (1 - a) - theta[k]) / R - qe[k]  # thermal load, kW
 
         # heat pump thermal power
         qc[k] = np.clip(lk, qc_min[k], qc_max[k])  # heat pump thermal power, kW
-        if not (is_winter[k] or is_summer[k]):  # if it's not heating or cooling season
-            qc[k] = 0  # turn heat pump off
+        return theta[k] + R * (qc[k] + qe[k])  # C
 
-        # temperature update
-        T[k + 1] = a * T[k] + (1 - a) * (theta[k] + R * (qc[k] + qe[k]))  # C
+    # thermal simulation, T[k+1] = a T[k] + (1 - a) (theta[k] + R (qc[k] + qe[k])); outside
+    # the heating and cooling seasons the heat pump is off, so those steps are simulated open-loop
+    is_off = ~(is_winter | is_summer)  # indicator that it's not heating or cooling season
+    T, _ = simulate_segments(np.full(n, T_set[0]), a, theta[:, None] + R * qe, is_off, control, 1 - a)  # C
 
     # electric power simulation
-    p = plug_powers[:, i_power] + qc / eta  # total building electrical load, kW
+    p = plug_power + qc / eta[:, None]  # total building electrical load, kW
 
     # building simulation results plot
     if to_plot:
         plt.figure(3, figsize=(8, 6))
         plots = [
-            (T[:-1], 'Indoor\ntemperature\n(°C)', None),
-            (qc, 'Heat pump\nthermal power\n(kW)', None),
-            (p, 'Total electrical\npower (kW)', [0, 5, 10])
+            (T[:-1, 0], 'Indoor\ntemperature\n(°C)', None),
+            (qc[:, 0], 'Heat pump\nthermal power\n(kW)', None),
+            (p[:, 0], 'Total electrical\npower (kW)', [0, 5, 10])
         ]
 
         for i, (y_data, ylabel, yticks) in enumerate(plots, 1):
@@ -147,6 +173,8 @@ def generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_ho
             if yticks is not None:
                 ax.set_yticks(yticks)
             if i == 3:
-                ax.text(t_span[-1], min(p) - 3, '2022', fontsize=16, ha='right', va='center', fontname='serif')
+                ax.text(t_span[-1], min(p[:, 0]) - 3, '2022', fontsize=16, ha='right', va='center', fontname='serif')
 
+    if single:
+        return p[:, 0]
     return p
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def pv_sizing_sweep(p, p_sun_unit, panel_areas, pi_buy, pi_sell, dt):
+    """
+    pvSizingSweep computes electricity bills over a grid of solar panel
+    areas, buy prices and sell prices. With a panel area A, the net demand
+    at time step k is p[k] - A p_sun_unit[k]: energy is bought at pi_buy
+    when it is positive and sold at pi_sell when it is negative.
+
+    Solar supply scales linearly with area, so step k switches from buying
+    to selling at the breakpoint area A = p[k] / p_sun_unit[k]. The steps
+    are sorted by breakpoint once, and prefix sums of p and p_sun_unit
+    then give the bought and sold energy for any area with one binary
+    search, instead of recomputing the net demand for every grid point.
+    The bill is linear in the prices, so the full price grid is an outer
+    product.
+
+    Input:
+      p, the K x 1 electricity demand, kW, or an n x K matrix with one row
+          per customer
+      p_sun_unit, the K x 1 (or n x K) solar power supply per unit panel
+          area, kW/m^2 (e.g. solar efficiency times surface irradiance)
+      panel_areas, the nA x 1 panel areas, m^2
+      pi_buy, the nb x 1 prices at which electricity is bought, $/kWh
+      pi_sell, the ns x 1 prices at which electricity is sold, $/kWh
+      dt, the time step, h
+
+    Output:
+      bill, the nA x nb x ns electricity bills, $ (n x nA x nb x ns for n
+          customers)
+      bought, the nA x 1 (or n x nA) energy bought, kWh
+      sold, the nA x 1 (or n x nA) energy sold, kWh
+
+    Example (with p, dt, Af, Stot and a finite solar_eta from simulateSolar,
+    and the annual cost without solar c1): the panel area with the largest
+    savings net of an annualized panel cost of $25/m^2, at each sell price,
+      panel_areas = np.linspace(0, Af / 2, 21)  # solar panel areas, m^2
+      pi_sells = np.array([0, 0.03, 0.15])  # sell prices, $/kWh
+      bills = pv_sizing_sweep(p, solar_eta * Stot, panel_areas, 0.15, pi_sells, dt)[0][:, 0, :]  # $
+      net_savings = c1 - bills - 25 * panel_areas[:, None]  # $/year
+      best_areas = panel_areas[np.argmax(net_savings, axis=0)]  # m^2
+    """
+
+    # one row per customer
+    single = np.ndim(p) == 1 and np.ndim(p_sun_unit) == 1
+    p = np.atleast_2d(np.asarray(p, dtype=float))
+    p_sun_unit = np.atleast_2d(np.asarray(p_sun_unit, dtype=float))
+    p, p_sun_unit = np.broadcast_arrays(p, p_sun_unit)
+    areas = np.atleast_1d(np.asarray(panel_areas, dtype=float))
+    pi_buy = np.atleast_1d(np.asarray(pi_buy, dtype=float))
+    pi_sell = np.atleast_1d(np.asarray(pi_sell, dtype=float))
+
+    bought = np.empty((len(p), len(areas)))
+    sold = np.empty((len(p), len(areas)))
+    for i in range(len(p)):
+        # steps without sun buy or sell the same amount at any area
+        sunny = p_sun_unit[i] > 0
+        dark = p[i][~sunny]
+        dark_bought = np.sum(np.maximum(dark, 0))
+        dark_sold = np.sum(np.maximum(-dark, 0))
+
+        # sunny steps sorted by breakpoint area, with prefix sums
+        order = np.argsort(p[i][sunny] / p_sun_unit[i][sunny])
+        ps, ss = p[i][sunny][order], p_sun_unit[i][sunny][order]
+        breakpoints = ps / ss
+        P = np.concatenate(([0], np.cumsum(ps)))  # demand of the first j steps, kW
+        S = np.concatenate(([0], np.cumsum(ss)))  # unit supply of the first j steps, kW/m^2
+
+        # steps with breakpoint <= A sell A s - p; the rest buy p - A s
+        j = np.searchsorted(breakpoints, areas, side='right')
+        sold[i] = (areas * S[j] - P[j] + dark_sold) * dt
+        bought[i] = ((P[-1] - P[j]) - areas * (S[-1] - S[j]) + dark_bought) * dt
+
+    # bills over the price grid
+    bill = bought[:, :, None, None] * pi_buy[:, None] - sold[:, :, None, None] * pi_sell
+
+    if single:
+        return bill[0], bought[0], sold[0]
+    return bill, bought, sold
@@ -0,0 +1,136 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# recently used plans, keyed by digests of the source and target times
+_plans = OrderedDict()
+_max_plans = 32
+_stats = {'hits': 0, 'misses': 0}
+
+
+class ResamplingPlan:
+    """
+    ResamplingPlan aligns data sampled at source times to a target time
+    span. It reproduces reindex(t_span).interpolate(method='linear'): values
+    at target times that match a source time exactly are kept, targets in
+    between are interpolated linearly by position, targets after the last
+    match repeat it, and targets before the first match are missing.
+
+    The source indices and weights are computed once, so applying the plan
+    to any number of channels is a single gather-and-blend.
+
+    Attributes:
+      left, right, the K x 1 source row indices to blend
+      weight, the K x 1 weight on the right row
+      missing, the K x 1 indicator of targets before the first match
+    """
+
+    def __init__(self, source, target):
+        # times in ns since 1970-01-01
+        source = np.asarray(source, dtype='datetime64[ns]').view(np.int64)
+        target = np.asarray(target, dtype='datetime64[ns]').view(np.int64)
+        K = len(target)
+
+        # exact matches, using the first of any duplicate source times
+        order = np.argsort(source, kind='stable')
+        sorted_source = source[order]
+        i = np.minimum(np.searchsorted(sorted_source, target), max(len(source) - 1, 0))
+        matched = (sorted_source[i] == target) if len(source) > 0 else np.zeros(K, dtype=bool)
+        k_known = np.flatnonzero(matched)
+
+        # neighbouring matches and linear weights
+        self.left = np.zeros(K, dtype=np.intp)
+        self.right = np.zeros(K, dtype=np.intp)
+        self.weight = np.zeros(K)
+        self.missing = np.ones(K, dtype=bool)
+        if len(k_known) > 0:
+            k = np.arange(K)
+            left = np.maximum(np.searchsorted(k_known, k, side='right') - 1, 0)  # last match at or before k
+            right = np.minimum(left + 1, len(k_known) - 1)  # next match after k
+            k_left, k_right = k_known[left], k_known[right]
+            self.left = order[i[k_left]]
+            self.right = order[i[k_right]]
+            self.weight = np.where(k_right > k_left, (k - k_left) / np.maximum(k_right - k_left, 1), 0.0)
+            self.missing = k < k_known[0]
+
+    def apply(self, values):
+        """
+        apply resamples data with the plan.
+
+        Input:
+          values, an n_source x 1 vector or n_source x n matrix of channels
+
+        Output:
+          resampled, a K x 1 vector or K x n matrix of resampled channels
+        """
+        values = np.asarray(values)
+        weight = self.weight if values.ndim == 1 else self.weight[:, None]
+        resampled = (1 - weight) * values[self.left] + weight * values[self.right]
+        resampled = resampled.astype(np.result_type(values.dtype, np.float32), copy=False)
+        resampled[self.missing] = np.nan
+        return resampled
+
+
+def resampling_plan(source, target):
+    """
+    resamplingPlan returns the ResamplingPlan from the source times to the
+    target times, reusing a cached plan when the same pair was seen before.
+
+    Input:
+      source, the n_source x 1 source datetimes (e.g. hourly weather data)
+      target, the K x 1 target datetime span
+
+    Output:
+      plan, the ResamplingPlan
+    """
+    source = np.ascontiguousarray(np.asarray(source, dtype='datetime64[ns]'))
+    target = np.ascontiguousarray(np.asarray(target, dtype='datetime64[ns]'))
+    key = (hashlib.sha1(source.view(np.int64)).hexdigest(), hashlib.sha1(target.view(np.int64)).hexdigest())
+    plan = _plans.get(key)
+    if plan is not None:
+        _stats['hits'] += 1
+        _plans.move_to_end(key)
+        return plan
+    _stats['misses'] += 1
+    plan = ResamplingPlan(source, target)
+    _plans[key] = plan
+    if len(_plans) > _max_plans:
+        _plans.popitem(last=False)
+    return plan
+
+
+def resampling_plan_cache_info():
+    """
+    resamplingPlanCacheInfo reports the hit/miss statistics of the cached
+    resampling plans.
+
+    Output:
+      info, a dict with hits, misses, size and max_size
+    """
+    return {'hits': _stats['hits'], 'misses': _stats['misses'], 'size': len(_plans), 'max_size': _max_plans}
+
+
+def replace_year(t_span, year):
+    """
+    replaceYear moves every datetime in a time span to the given year,
+    keeping the month, day and time of day. It is a vectorized version of
+    t_span.map(lambda x: x.replace(year=year)): each distinct date is
+    converted once.
+
+    Input:
+      t_span, the K x 1 datetime span
+      year, the new year
+
+    Output:
+      t_new, the K x 1 datetime span in the new year
+    """
+    import pandas as pd
+
+    t_ns = np.asarray(t_span, dtype='datetime64[ns]').view(np.int64)
+    day_ns = t_ns - np.mod(t_ns, 24 * 3600 * 10 ** 9)  # midnight of each date
+    unique_days, codes = np.unique(day_ns, return_inverse=True)
+    unique_days = pd.DatetimeIndex(unique_days.view('datetime64[ns]'))
+    new_days = pd.to_datetime(pd.DataFrame({'year': year, 'month': unique_days.month, 'day': unique_days.day}))
+    new_ns = new_days.to_numpy(dtype='datetime64[ns]').view(np.int64)[codes] + (t_ns - day_ns)
+    return pd.DatetimeIndex(new_ns.view('datetime64[ns]'))
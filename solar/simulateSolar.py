@@ -18,27 +18,34 @@ Required Files:
 - surfaceIrradiance.py (computes irradiance on surfaces)
 """
 
+import sys
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from importWeather import import_weather
-from generateElectricityDemand import generate_electricity_demand
+from demandCache import cached_electricity_demand
 from solarAngles import solar_angles
 from surfaceIrradiance import surface_irradiance
-import matplotlib.dates as mdates
-import matplotlib.ticker as mticker  # Import ticker for formatting
 
 # ==============================================================================
 # graphics settings
 # ==============================================================================
-
-plt.rc('font', size=22)
-plt.rc('axes', titlesize=20, labelsize=18)
-plt.rc('xtick', labelsize=20)
-plt.rc('ytick', labelsize=20)
-plt.rc('legend', fontsize=18)
-plt.rc('figure', titlesize=22)
-plt.rc('lines', linewidth=3)
+# run with --no-plot to simulate without graphics (e.g. in batch jobs), or with
+# --plot-demand to also plot the building simulation (which bypasses the demand cache)
+to_plot = '--no-plot' not in sys.argv  # indicator of whether to plot simulation data and results
+plot_demand = to_plot and '--plot-demand' in sys.argv  # indicator of whether to plot the demand simulation
+
+if to_plot:
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    import matplotlib.ticker as mticker  # Import ticker for formatting
+
+    plt.rc('font', size=22)
+    plt.rc('axes', titlesize=20, labelsize=18)
+    plt.rc('xtick', labelsize=20)
+    plt.rc('ytick', labelsize=20)
+    plt.rc('legend', fontsize=18)
+    plt.rc('figure', titlesize=22)
+    plt.rc('lines', linewidth=3)
 
 # ==============================================================================
 # input data
@@ -61,8 +68,8 @@ theta, total_horizontal, beam_normal, diffuse_horizontal, offset_gmt = import_we
 electricity_file = 'MFRED-2019-NYC-Apartments-Electricity-Data.csv'  # electricity file name
 Af = 200  # floor area, m^2
 N = 2  # number of stories
-to_plot = 1  # indicator of whether to plot simulation data and results
-p = generate_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, to_plot)  # total electricity demand, kW
+seed = 0  # seed of the thermal noise: every run draws the same noise, so the demand is cached on disk (None draws fresh noise each run, without caching)
+p = cached_electricity_demand(t_span, electricity_file, Af, N, theta, total_horizontal, plot_demand, seed=seed)  # total electricity demand, kW
 
 # ==============================================================================
 # irradiance
@@ -81,23 +88,24 @@ Stot, Sb, Sd = surface_irradiance(az, el, az0, bet, beam_normal, diffuse_horizon
 # irradiance plot
 p_lim = [0, 1]
 t_lim = [t_span[0], t_span[-1]]
-plt.figure(4, figsize=(10, 6), constrained_layout=True)
-irradiance_data = [(Stot, 'Total surface\nirradiance\n(kW/m$^2$)', p_lim, [0, 0.5, 1]),
-                   (Sb, 'Beam surface\nirradiance\n(kW/m$^2$)', p_lim, [0, 0.5, 1]),
-                   (Sd, 'Diffuse surface\nirradiance\n(kW/m$^2$)', p_lim, [0, 0.5, 1])]
-
-for i, (y_data, ylabel, ylim, yticks) in enumerate(irradiance_data, start=1):
-    ax = plt.subplot(3, 1, i)
-    plt.plot(t_span, y_data, 'k', linewidth=2)
-    plt.grid(True)
-    ax.set_ylabel(ylabel, labelpad=10, loc='center', fontname='serif')
-    ax.set_ylim(ylim)
-    ax.set_yticks(yticks)
-    ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{int(x)}' if x.is_integer() else f'{x}'))
-    ax.xaxis.set_major_locator(mdates.MonthLocator())
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
-    ax.text(t_span[-1], ylim[0] - 0.4, '2022', fontsize=16, ha='right', va='center', fontname='serif')
-plt.draw()
+if to_plot:
+    plt.figure(4, figsize=(10, 6), constrained_layout=True)
+    irradiance_data = [(Stot, 'Total surface\nirradiance\n(kW/m$^2$)', p_lim, [0, 0.5, 1]),
+                       (Sb, 'Beam surface\nirradiance\n(kW/m$^2$)', p_lim, [0, 0.5, 1]),
+                       (Sd, 'Diffuse surface\nirradiance\n(kW/m$^2$)', p_lim, [0, 0.5, 1])]
+
+    for i, (y_data, ylabel, ylim, yticks) in enumerate(irradiance_data, start=1):
+        ax = plt.subplot(3, 1, i)
+        plt.plot(t_span, y_data, 'k', linewidth=2)
+        plt.grid(True)
+        ax.set_ylabel(ylabel, labelpad=10, loc='center', fontname='serif')
+        ax.set_ylim(ylim)
+        ax.set_yticks(yticks)
+        ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{int(x)}' if x.is_integer() else f'{x}'))
+        ax.xaxis.set_major_locator(mdates.MonthLocator())
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+        ax.text(t_span[-1], ylim[0] - 0.4, '2022', fontsize=16, ha='right', va='center', fontname='serif')
+    plt.draw()
 
 
 # ==============================================================================
@@ -116,23 +124,24 @@ panel_a = Af / 4  # solar panel area, m^2
 p_sun = panel_a * solar_eta * Stot  # solar power supply, kW
 
 # Power plot
-plt.figure(5, figsize=(10, 6), constrained_layout=True)
-data = [(p, 'Power demand\n(kW)', (0, 10), [0, 5, 10]),
-        (p_sun, 'Solar power\nsupply (kW)', (0, 10), [0, 5, 10]),
-        (p - p_sun, 'Net power\ndemand (kW)', (-10, 10), [-10, 0, 10])]
-
-for i, (y_data, ylabel, ylim, yticks) in enumerate(data, start=1):
-    ax = plt.subplot(3, 1, i)
-    plt.plot(t_span, y_data, 'k', linewidth=2)
-    plt.grid(True)
-    ax.set_ylabel(ylabel, labelpad=10, loc='center', fontname='serif')
-    ax.set_ylim(ylim)
-    ax.set_yticks(yticks)
-    ax.xaxis.set_major_locator(mdates.MonthLocator())
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
-    ax.text(t_span[-1], ylim[0] - 5, '2022', fontsize=16, ha='right', va='center', fontname='serif')
-
-plt.draw()
+if to_plot:
+    plt.figure(5, figsize=(10, 6), constrained_layout=True)
+    data = [(p, 'Power demand\n(kW)', (0, 10), [0, 5, 10]),
+            (p_sun, 'Solar power\nsupply (kW)', (0, 10), [0, 5, 10]),
+            (p - p_sun, 'Net power\ndemand (kW)', (-10, 10), [-10, 0, 10])]
+
+    for i, (y_data, ylabel, ylim, yticks) in enumerate(data, start=1):
+        ax = plt.subplot(3, 1, i)
+        plt.plot(t_span, y_data, 'k', linewidth=2)
+        plt.grid(True)
+        ax.set_ylabel(ylabel, labelpad=10, loc='center', fontname='serif')
+        ax.set_ylim(ylim)
+        ax.set_yticks(yticks)
+        ax.xaxis.set_major_locator(mdates.MonthLocator())
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+        ax.text(t_span[-1], ylim[0] - 5, '2022', fontsize=16, ha='right', va='center', fontname='serif')
+
+    plt.draw()
 
 
 # ==============================================================================
@@ -159,5 +168,6 @@ c3 = np.nan
 print(f'Electricity cost with solar and reduced net metering: ${c3}.')
 print(f'Cost reduction from solar with reduced net metering: ${c1 - c3} ({round(100 * (1 - c3 / c1))}%).')
 
-plt.ioff()
-plt.show()
\ No newline at end of file
+if to_plot:
+    plt.ioff()
+    plt.show()
\ No newline at end of file
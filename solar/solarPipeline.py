@@ -0,0 +1,130 @@
+import numpy as np
+from weatherCache import weather_cache
+from importWeather import import_weather
+from solarPosition import solar_angles
+from surfaceIrradianceBatch import surface_irradiance
+
+
+def solar_pipeline(weather_files, lat, long, az0, tilt, panel_area, efficiency, dt=0.25,
+                   demand=None, pi_buy=0.15, pi_sell=0.03, start=None, end=None):
+    """
+    solarPipeline streams weather data through the solar model one month at
+    a time and yields running totals, so memory use does not grow with the
+    simulation horizon. Each month of weather is retimed by import_weather,
+    converted to sun angles by solar_angles and to irradiance on each panel
+    by surface_irradiance, and multiplied by the panel area and efficiency
+    to get the solar power supply. Only n x 1 totals are carried from one
+    month to the next.
+
+    The n sites share the weather data (one location), but may differ in
+    latitude, longitude, panel orientation and panel area. Several weather
+    files, e.g. one per year, are processed back to back.
+
+    Input:
+      weather_files, an OikoLab CSV weather file name or a list of them, in
+          chronological order
+      lat, the scalar or n x 1 site latitudes, degrees
+      long, the scalar or n x 1 site longitudes, degrees
+      az0, the scalar or n x 1 panel azimuth angles, degrees
+      tilt, the scalar or n x 1 panel tilt angles, degrees
+      panel_area, the scalar or n x 1 panel areas, m^2
+      efficiency, the solar array efficiency, a scalar or a function that
+          maps the K x 1 outdoor temperature (C) to K x 1 efficiencies
+      dt, the time step, h
+      demand, (optional) a function demand(t, theta, total_horizontal)
+          that returns the K x 1 or n x K electricity demand in kW over the
+          month's datetimes t, given the outdoor temperature theta (C) and
+          total horizontal irradiance (kW/m^2); zero if not given
+      pi_buy, the price at which electricity is bought, $/kWh
+      pi_sell, the price at which electricity is sold, $/kWh
+      start, (optional) the first month to simulate, e.g. '2022-03'
+      end, (optional) the last month to simulate
+
+    Output (yielded once per month):
+      totals, a dict of running totals since the first month, with keys
+        month, the month just simulated (datetime64[M])
+        steps, the number of time steps simulated
+        generation, the n x 1 solar energy supplied, kWh
+        demand, the n x 1 electricity demand, kWh
+        bought, the n x 1 energy bought, kWh
+        sold, the n x 1 energy sold, kWh
+        bill, the n x 1 electricity bills, $
+        peak_export, the n x 1 largest power sold, kW
+        peak_export_time, the n x 1 datetimes of peak_export
+    """
+
+    # one row per site
+    if isinstance(weather_files, str):
+        weather_files = [weather_files]
+    lat, long, az0, tilt, panel_area = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (lat, long, az0, tilt, panel_area)))
+    n = len(lat)
+    step = np.timedelta64(int(round(dt * 3.6e12)), 'ns')  # time step
+
+    # running totals
+    totals = {
+        'month': None,
+        'steps': 0,
+        'generation': np.zeros(n),
+        'demand': np.zeros(n),
+        'bought': np.zeros(n),
+        'sold': np.zeros(n),
+        'bill': np.zeros(n),
+        'peak_export': np.zeros(n),
+        'peak_export_time': np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]'),
+    }
+    first = None if start is None else np.datetime64(start, 'M')
+    last = None if end is None else np.datetime64(end, 'M')
+    done = None  # last month simulated, so overlapping files are not counted twice
+
+    for weather_file in weather_files:
+        # months that the file covers entirely (to within one data interval)
+        timestamp = weather_cache(weather_file)['timestamp'].view('datetime64[ns]')
+        months = np.arange((timestamp[0] - np.timedelta64(1, 'ns')).astype('datetime64[M]') + 1,
+                           (timestamp[-1] + (timestamp[-1] - timestamp[-2])).astype('datetime64[M]'))
+        for month in months:
+            if (first is not None and month < first) or (last is not None and month > last) \
+                    or (done is not None and month <= done):
+                continue
+            done = month
+
+            # the month's time steps, plus the first step of the next month
+            # so that the last hour is interpolated as in a single long run
+            t_stop = (month + 1).astype('datetime64[ns]')
+            t_span = np.arange(month.astype('datetime64[ns]'), t_stop + step, step)
+            theta, total_horizontal, beam_normal, diffuse_horizontal, offset_gmt = \
+                (x[:-1] for x in import_weather(weather_file, t_span))
+            t_span = t_span[:-1]
+
+            # solar power supply, kW
+            el, az = solar_angles(lat, long, t_span, offset_gmt, cache=False)  # n x K, degrees
+            eta = efficiency(theta) if callable(efficiency) else efficiency
+            p_sun = np.empty((n, len(t_span)))
+            for i in range(n):
+                p_sun[i] = surface_irradiance(az[i], el[i], az0[i], tilt[i], beam_normal, diffuse_horizontal)[0]
+            p_sun *= panel_area[:, None] * eta
+
+            # electricity demand and net demand, kW
+            if demand is None:
+                p = np.zeros((n, len(t_span)))
+            else:
+                p = np.broadcast_to(demand(t_span, theta, total_horizontal), (n, len(t_span)))
+            net = p - p_sun
+            bought = np.sum(np.maximum(net, 0), axis=1) * dt  # kWh
+            sold = np.sum(np.maximum(-net, 0), axis=1) * dt  # kWh
+
+            # update the running totals
+            k_peak = np.argmin(net, axis=1)
+            peak = -net[np.arange(n), k_peak]
+            new_peak = peak > totals['peak_export']
+            totals['peak_export'][new_peak] = peak[new_peak]
+            totals['peak_export_time'][new_peak] = t_span[k_peak[new_peak]]
+            totals['month'] = month
+            totals['steps'] += len(t_span)
+            totals['generation'] += np.sum(p_sun, axis=1) * dt
+            totals['demand'] += np.sum(p, axis=1) * dt
+            totals['bought'] += bought
+            totals['sold'] += sold
+            totals['bill'] += pi_buy * bought - pi_sell * sold
+
+            yield {key: value.copy() if isinstance(value, np.ndarray) else value for key, value in totals.items()}
@@ -0,0 +1,139 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# recently computed angles, keyed by digests of the sites and the time span
+_angles = OrderedDict()
+_max_bytes = 2 ** 28  # cache budget, bytes
+_stats = {'hits': 0, 'misses': 0}
+
+
+def solar_angles(lat, long, t, offset_gmt, block=256, cache=True):
+    """
+     solarPosition computes the sun's elevation and azimuth angles, as seen
+     by an observer at the input location. It is a vectorized, cached
+     counterpart of the solarAngles exercise for the headless tools
+     (solarPipeline, solarStudy, syntheticWeather and the ders package).
+
+     The declination, equation of time and clock hour angle depend only on
+     the time, so they are computed once per time step (the declination and
+     equation of time once per day). Each site then only shifts the hour
+     angle by its longitude, which is a rotation by a per-site cosine and
+     sine rather than new trigonometry at every time step. Results are
+     cached per set of sites and time span (which fixes the year and time
+     step), so repeated calls, e.g. one per panel orientation, are free.
+
+     Input arguments must be scalars or columns. lat and long may also be
+     n x 1 vectors of sites, in which case the outputs are n x K matrices.
+
+     Inputs:
+       lat, the observer's latitude in degrees
+       long, the observer's longitude in degrees
+       t, the local datetime or array of datetimes
+       offset_gmt, the time difference between local and GMT
+           (for example, offset_gmt = -5 for US Eastern Time), a scalar or
+           one value per datetime
+       block, the number of sites processed at once
+       cache, an indicator of whether to look up and store results in the
+           cache (streaming callers that never revisit a time span can skip it)
+
+     Outputs:
+       el, the sun's elevation angle in degrees
+           convention: 0 at sunrise/sunset
+       az, the sun's azimuth angle in degrees
+           convention: 0 south, 90 west, +/-180 north, -90 east
+ """
+
+    # sites and times
+    scalar = np.ndim(lat) == 0 and np.ndim(long) == 0
+    lat, long = np.broadcast_arrays(np.atleast_1d(np.asarray(lat, dtype=float)),
+                                    np.atleast_1d(np.asarray(long, dtype=float)))
+    t = np.atleast_1d(np.asarray(t, dtype='datetime64[ns]'))
+    offset_gmt = np.broadcast_to(np.asarray(offset_gmt, dtype=float), t.shape)
+
+    if not cache:
+        el, az = _solar_angles(lat, long, t, offset_gmt, block)
+        return (el[0], az[0]) if scalar else (el, az)
+
+    # reuse earlier results
+    key = tuple(hashlib.sha1(np.ascontiguousarray(x)).hexdigest() for x in (lat, long, t.view(np.int64), offset_gmt))
+    if key in _angles:
+        _stats['hits'] += 1
+        _angles.move_to_end(key)
+        el, az = _angles[key]
+    else:
+        _stats['misses'] += 1
+        el, az = _solar_angles(lat, long, t, offset_gmt, block)
+        el.flags.writeable = False
+        az.flags.writeable = False
+        _angles[key] = (el, az)
+        while len(_angles) > 1 and sum(e.nbytes + a.nbytes for e, a in _angles.values()) > _max_bytes:
+            _angles.popitem(last=False)
+
+    if scalar:
+        return el[0], az[0]
+    return el, az
+
+
+def solar_angles_cache_info():
+    """
+    solarAnglesCacheInfo reports the hit/miss statistics of the cached
+    solar angles.
+
+    Output:
+      info, a dict with hits, misses, size (number of entries), nbytes and
+          max_bytes
+    """
+    nbytes = sum(e.nbytes + a.nbytes for e, a in _angles.values())
+    return {'hits': _stats['hits'], 'misses': _stats['misses'], 'size': len(_angles),
+            'nbytes': nbytes, 'max_bytes': _max_bytes}
+
+
+def solar_angles_cache_clear():
+    """
+    solarAnglesCacheClear empties the solar angle cache and resets its
+    statistics.
+    """
+    _angles.clear()
+    _stats.update(hits=0, misses=0)
+
+
+def _solar_angles(lat, long, t, offset_gmt, block):
+    deg = np.pi / 180
+
+    # day of year and clock hour
+    day = t.astype('datetime64[D]')
+    n = (day - t.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1  # day of year
+    hour = (t - day).astype(np.int64) / 3.6e12  # local clock hour
+
+    # declination and equation of time, once per distinct day
+    n_days, i_day = np.unique(n, return_inverse=True)
+    delta = 23.45 * np.sin(360 / 365 * (n_days - 81) * deg)  # declination, degrees
+    B = 360 / 364 * (n_days - 81) * deg
+    E = 9.87 * np.sin(2 * B) - 7.53 * np.cos(B) - 1.5 * np.sin(B)  # equation of time, minutes
+    sin_delta = np.sin(delta * deg)[i_day]
+    cos_delta = np.cos(delta * deg)[i_day]
+
+    # hour angle at longitude 0, positive in the afternoon; the solar time
+    # is the clock time + 4 minutes per degree east of the time zone's
+    # meridian (15 offset_gmt) + the equation of time
+    omega0 = (15 * (hour - 12) + E[i_day] / 4 - 15 * offset_gmt) * deg
+    cos_delta_cos_omega0 = cos_delta * np.cos(omega0)
+    cos_delta_sin_omega0 = cos_delta * np.sin(omega0)
+
+    # per-site rotation of the hour angle by the longitude
+    el = np.empty((len(lat), len(t)))
+    az = np.empty((len(lat), len(t)))
+    for i in range(0, len(lat), block):
+        sin_lat = np.sin(lat[i:i + block, None] * deg)
+        cos_lat = np.cos(lat[i:i + block, None] * deg)
+        cos_long = np.cos(long[i:i + block, None] * deg)
+        sin_long = np.sin(long[i:i + block, None] * deg)
+        X = cos_delta_cos_omega0 * cos_long - cos_delta_sin_omega0 * sin_long  # cos(delta) cos(omega)
+        Y = cos_delta_sin_omega0 * cos_long + cos_delta_cos_omega0 * sin_long  # cos(delta) sin(omega)
+        sin_el = np.clip(cos_lat * X + sin_lat * sin_delta, -1, 1)
+        el[i:i + block] = np.arcsin(sin_el) / deg
+        az[i:i + block] = np.arctan2(Y, sin_lat * X - cos_lat * sin_delta) / deg
+
+    return el, az
@@ -0,0 +1,237 @@
+import numpy as np
+from importWeather import import_weather
+from demandCache import cached_electricity_demand
+from solarPosition import solar_angles
+from surfaceIrradianceBatch import surface_irradiance
+from tariffBills import tou_periods, tariff_bills
+from batteryDispatch import battery_dispatch
+
+
+class StageRunner:
+    """
+    StageRunner evaluates a directed acyclic graph of stages. Each stage is
+    a function that declares the named values it takes as inputs and the
+    named values it returns as outputs. Inputs are either parameters or
+    outputs of other stages.
+
+    Outputs are memoized. Every value carries a version number, and a stage
+    remembers the versions of the inputs it last ran with, so it reruns
+    only if one of them has changed since. Changing a parameter therefore
+    recomputes the stages downstream of it and nothing else, and only when
+    one of their outputs is requested.
+
+    Attributes:
+      parameters, a dict of parameter values
+      stages, a dict mapping each stage name to its (function, inputs,
+          outputs)
+      runs, a dict counting how many times each stage has run
+    """
+
+    def __init__(self, **parameters):
+        self.parameters = {}
+        self.stages = {}
+        self.runs = {}
+        self._producers = {}  # output name -> stage name
+        self._values = {}  # output name -> value
+        self._versions = {}  # parameter or output name -> version
+        self._ran_with = {}  # stage name -> input versions at the last run
+        self.set(**parameters)
+
+    def add_stage(self, name, function, inputs, outputs):
+        """
+        addStage declares a stage.
+
+        Input:
+          name, the stage name
+          function, a function of the inputs, in order, that returns the
+              output (or a tuple of outputs, if there are several)
+          inputs, the names of the input values
+          outputs, the names of the output values
+        """
+        self.stages[name] = (function, tuple(inputs), tuple(outputs))
+        self.runs[name] = 0
+        for output in outputs:
+            self._producers[output] = name
+
+    def set(self, **parameters):
+        """
+        set changes parameter values. A parameter set to a value equal to
+        its current one does not invalidate anything.
+        """
+        for name, value in parameters.items():
+            if name in self.parameters and _equal(self.parameters[name], value):
+                continue
+            self.parameters[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, *names):
+        """
+        get returns values, running any stages whose inputs changed.
+
+        Input:
+          names, the names of parameters or stage outputs
+
+        Output:
+          values, the value of each name (a single value for one name)
+        """
+        values = []
+        for name in names:
+            if name in self.parameters:
+                values.append(self.parameters[name])
+            elif name in self._producers:
+                self._update(self._producers[name])
+                values.append(self._values[name])
+            else:
+                raise KeyError(f'{name} is neither a parameter nor a stage output')
+        return values[0] if len(names) == 1 else tuple(values)
+
+    def _update(self, stage):
+        # bring the inputs up to date, then rerun the stage if any changed
+        function, inputs, outputs = self.stages[stage]
+        for name in inputs:
+            if name in self._producers:
+                self._update(self._producers[name])
+        versions = tuple(self._versions[name] for name in inputs)
+        if self._ran_with.get(stage) == versions:
+            return
+        result = function(*(self.parameters[name] if name in self.parameters else self._values[name]
+                            for name in inputs))
+        if len(outputs) == 1:
+            result = (result,)
+        for name, value in zip(outputs, result):
+            self._values[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+        self._ran_with[stage] = versions
+        self.runs[stage] += 1
+
+
+def _equal(a, b):
+    # whether two parameter values are the same
+    if a is b:
+        return True
+    try:
+        return bool(np.array_equal(a, b))
+    except (TypeError, ValueError):
+        return False
+
+
+def solar_study(efficiency, **parameters):
+    """
+    solarStudy sets up the simulateSolar study as a StageRunner:
+
+      time -> weather -> demand
+                      -> angles -> irradiance -> solar power -> bills
+                      -> efficiency -------------^     |       ^
+      time -> TOU periods -----------------------------+-------'
+                                                       v
+                                       battery -> battery bills
+
+    so that e.g. changing pi_sell reruns only the bills stage (and the
+    battery stages, if their outputs are requested), while changing tilt
+    reruns the irradiance, solar power and bills stages.
+
+    Example:
+      study = solar_study(0.18)
+      c1, c2 = study.get('cost_without_solar', 'cost_with_solar')
+      study.set(pi_sell=0.05)  # only the bills are recomputed
+      c2 = study.get('cost_with_solar')
+
+    Input:
+      efficiency, the solar array efficiency, a scalar or a function that
+          maps the K x 1 outdoor temperature (C) to K x 1 efficiencies
+      parameters, (optional) values that replace the defaults below
+
+    Parameters:
+      dt, the time step, h
+      weather_file, electricity_file, the weather and electricity CSV files
+      Af, N, seed, the floor area (m^2), number of stories and noise seed
+          of the building (see cachedElectricityDemand)
+      lat, long, the latitude and longitude, degrees
+      az0, tilt, the panel azimuth and tilt angles, degrees
+      panel_a, the panel area, m^2
+      tou_windows, the time-of-use peak windows (see touPeriods)
+      pi_buy, pi_sell, tier_limits, tier_prices, pi_demand, the tariff
+          (see tariffBills)
+      battery_capacity, battery_power, the battery's energy capacity (kWh)
+          and maximum charging and discharging power (kW); the battery is
+          dispatched against the TOU energy prices (see batteryDispatch)
+
+    Output:
+      study, a StageRunner whose outputs include t_span, theta, p, el, az,
+          Stot, solar_eta, p_sun, periods, bills (monthly bills without and
+          with solar, 2 x 12, $), cost_without_solar and cost_with_solar
+          (annual costs, $), x_batt and p_batt (the battery's stored
+          energy, kWh, and power, kW), and cost_with_battery (annual cost
+          with solar and the battery, $)
+    """
+    defaults = {
+        'dt': 0.25,
+        'weather_file': 'west-lafayette-2022-weather.csv',
+        'electricity_file': 'MFRED-2019-NYC-Apartments-Electricity-Data.csv',
+        'Af': 200,
+        'N': 2,
+        'seed': 0,
+        'lat': 40.4259,
+        'long': -86.9081,
+        'az0': 0,
+        'tilt': 40.4259,
+        'panel_a': 50,
+        'tou_windows': [],
+        'pi_buy': 0.15,
+        'pi_sell': 0.03,
+        'tier_limits': [],
+        'tier_prices': [0],
+        'pi_demand': 0,
+        'battery_capacity': 13.5,
+        'battery_power': 5,
+    }
+    study = StageRunner(**{**defaults, **parameters, 'efficiency': efficiency})
+
+    study.add_stage('time', _time_span, ['dt'], ['t_span'])
+    study.add_stage('weather', import_weather, ['weather_file', 't_span'],
+                    ['theta', 'total_horizontal', 'beam_normal', 'diffuse_horizontal', 'offset_gmt'])
+    study.add_stage('demand', lambda *args: cached_electricity_demand(*args[:6], False, seed=args[6]),
+                    ['t_span', 'electricity_file', 'Af', 'N', 'theta', 'total_horizontal', 'seed'], ['p'])
+    study.add_stage('angles', solar_angles, ['lat', 'long', 't_span', 'offset_gmt'], ['el', 'az'])
+    study.add_stage('irradiance', lambda *args: surface_irradiance(*args)[0],
+                    ['az', 'el', 'az0', 'tilt', 'beam_normal', 'diffuse_horizontal'], ['Stot'])
+    study.add_stage('efficiency', lambda eta, theta: eta(theta) if callable(eta) else eta,
+                    ['efficiency', 'theta'], ['solar_eta'])
+    study.add_stage('solar power', lambda panel_a, eta, Stot: panel_a * eta * Stot,
+                    ['panel_a', 'solar_eta', 'Stot'], ['p_sun'])
+    study.add_stage('periods', tou_periods, ['t_span', 'tou_windows'], ['periods'])
+    study.add_stage('bills', _bills,
+                    ['p', 'p_sun', 't_span', 'dt', 'periods', 'pi_buy', 'pi_sell', 'tier_limits', 'tier_prices',
+                     'pi_demand'],
+                    ['bills', 'cost_without_solar', 'cost_with_solar'])
+    study.add_stage('battery', _battery,
+                    ['p', 'p_sun', 'dt', 'periods', 'pi_buy', 'pi_sell', 'battery_capacity', 'battery_power'],
+                    ['x_batt', 'p_batt'])
+    study.add_stage('battery bills', lambda p, p_sun, p_batt, *tariff: _bills(p + p_batt, p_sun, *tariff)[2],
+                    ['p', 'p_sun', 'p_batt', 't_span', 'dt', 'periods', 'pi_buy', 'pi_sell', 'tier_limits',
+                     'tier_prices', 'pi_demand'],
+                    ['cost_with_battery'])
+    return study
+
+
+def _time_span(dt):
+    # one year at the time step, as in simulateSolar
+    import pandas as pd
+    return pd.date_range(start='2022-01-01', end='2022-12-31 23:00:00', freq=f'{int(dt * 60)}min')
+
+
+def _battery(p, p_sun, dt, periods, pi_buy, pi_sell, capacity, power):
+    # cost-minimizing battery dispatch at the TOU energy prices
+    if capacity == 0:
+        return np.zeros(len(p) + 1), np.zeros(len(p))
+    pi_buy = np.asarray(pi_buy, dtype=float)[periods] if np.ndim(pi_buy) > 0 else pi_buy  # $/kWh
+    pi_sell = np.asarray(pi_sell, dtype=float)[periods] if np.ndim(pi_sell) > 0 else pi_sell  # $/kWh
+    x, p_batt, _ = battery_dispatch(p - p_sun, dt, pi_buy, pi_sell, capacity, power)
+    return x, p_batt
+
+
+def _bills(p, p_sun, t_span, dt, periods, pi_buy, pi_sell, tier_limits, tier_prices, pi_demand):
+    # monthly bills and annual costs without and with solar
+    bills = tariff_bills(np.vstack((p, p - p_sun)), t_span, dt, periods, pi_buy, pi_sell, tier_limits, tier_prices,
+                         pi_demand)[0]
+    return bills, np.sum(bills[0]), np.sum(bills[1])
@@ -0,0 +1,75 @@
+import numpy as np
+
+def surface_irradiance(az, el, az0, tilt, beam_normal, diffuse_horizontal, dt=None, block=64):
+    """
+    surfaceIrradianceBatch calculates the solar irradiance on a surface,
+    meaning the power per unit area from sunlight, for one or many surface
+    orientations. It is a batched counterpart of the surfaceIrradiance
+    exercise for the headless tools (solarPipeline, solarStudy and the ders
+    package).
+
+    The beam irradiance is the beam normal irradiance times the cosine of
+    the angle between the sun and the surface normal (zero when the sun is
+    behind the surface or below the horizon). The diffuse irradiance assumes
+    an isotropic sky, so a surface tilted by tilt sees a fraction
+    (1 + cos(tilt))/2 of the diffuse horizontal irradiance.
+
+    az0 and tilt may be n x 1 vectors of surface orientations. The sun
+    vector is computed once, so the incidence cosines of all orientations
+    are a single n x 3 by 3 x K matrix product. If dt is given, only the
+    total energy per orientation is returned; orientations are then
+    processed in blocks and the n x K irradiance is never stored.
+
+    Input:
+        az, a K x 1 vector of solar azimuth angles, in degrees
+        el, a K x 1 vector of solar elevation angles, in degrees
+        az0, a scalar or n x 1 vector of surface azimuth angles, in degrees
+        tilt, a scalar or n x 1 vector of surface tilt angles, in degrees
+        beam_normal, a K x 1 vector of beam irradiances on a surface normal to
+            the sun, in kW/m^2
+        diffuse_horizontal, a K x 1 vector of diffuse irradiances on a
+            horizontal surface, in kW/m^2
+        dt, the time step in h (optional; if given, energies are returned)
+        block, the number of orientations processed at once when dt is given
+
+    Output:
+        Stot, the total irradiance on the surface, in kW/m^2
+        Sb, the beam irradiance on the surface, in kW/m^2
+        Sd, the diffuse irradiance on the surface, in kW/m^2
+        (K x 1 vectors for a scalar orientation, n x K matrices for n
+        orientations, or n x 1 vectors of energy in kWh/m^2 if dt is given)
+    """
+
+    deg = np.pi / 180
+
+    # sun vector (south, west, up components), once for all orientations
+    az = np.asarray(az, dtype=float) * deg
+    el = np.asarray(el, dtype=float) * deg
+    sun = np.stack((np.cos(el) * np.cos(az), np.cos(el) * np.sin(az), np.sin(el)))  # 3 x K
+    beam = np.where(el > 0, np.asarray(beam_normal, dtype=float), 0)  # no beam from below the horizon, kW/m^2
+    diffuse = np.asarray(diffuse_horizontal, dtype=float)
+
+    # surface normals, one row per orientation
+    scalar = np.ndim(az0) == 0 and np.ndim(tilt) == 0
+    az0, tilt = np.broadcast_arrays(np.atleast_1d(np.asarray(az0, dtype=float)) * deg,
+                                    np.atleast_1d(np.asarray(tilt, dtype=float)) * deg)
+    normal = np.column_stack((np.sin(tilt) * np.cos(az0), np.sin(tilt) * np.sin(az0), np.cos(tilt)))  # n x 3
+    sky = (1 + np.cos(tilt)) / 2  # fraction of the sky dome seen by each surface
+
+    # total energy per orientation, without storing the irradiance
+    if dt is not None:
+        Eb = np.empty(len(normal))
+        for i in range(0, len(normal), block):
+            Eb[i:i + block] = np.maximum(normal[i:i + block] @ sun, 0) @ beam * dt
+        Ed = sky * np.sum(diffuse) * dt
+        if scalar:
+            return Eb[0] + Ed[0], Eb[0], Ed[0]
+        return Eb + Ed, Eb, Ed
+
+    # irradiance time series
+    Sb = np.maximum(normal @ sun, 0) * beam
+    Sd = sky[:, None] * diffuse
+    Stot = Sb + Sd
+    if scalar:
+        return Stot[0], Sb[0], Sd[0]
+    return Stot, Sb, Sd
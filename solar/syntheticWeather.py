@@ -0,0 +1,193 @@
+import numpy as np
+from importWeather import import_weather
+from solarPosition import solar_angles
+
+
+def fit_weather_model(weather_file, t_span, lat, long):
+    """
+    fitWeatherModel fits a stochastic weather model to an OikoLab weather
+    file, for drawing synthetic weather years with syntheticWeather.
+
+    Sunlight is modeled as a clear-sky irradiance (the Haurwitz model, a
+    function of the sun's elevation) times a clear-sky index. The daily
+    clear-sky index has a seasonal mean and spread, and its standardized
+    anomalies follow a first-order autoregressive (AR(1)) process whose
+    marginal distribution is mapped back to the observed anomalies. Within
+    each day, the index varies around the daily value by a second AR(1)
+    process. Beam and diffuse irradiance are split by the diffuse fraction
+    observed at each clearness index (a binned version of the Erbs
+    correlation, fitted to the file).
+
+    The outdoor temperature is a least-squares fit of annual and daily
+    harmonics, with the daily cloud anomaly shifting the mean and damping
+    the daily cycle. The residuals are a daily AR(1) process with a
+    seasonal spread (multi-day warm and cold spells, larger in winter)
+    plus an AR(1) process within days.
+
+    Input:
+      weather_file, the name of the OikoLab CSV weather file
+      t_span, the K x 1 datetimes of one year (as passed to import_weather)
+      lat, the latitude, degrees
+      long, the longitude, degrees
+
+    Output:
+      model, a dict of fitted parameters and the K x 1 calendar quantities
+          (time span, sun elevation, clear-sky irradiance, day index and
+          offset_gmt) that every synthetic year shares
+    """
+
+    theta, total_horizontal, beam_normal, diffuse_horizontal, offset_gmt = import_weather(weather_file, t_span)
+    t = np.asarray(t_span, dtype='datetime64[ns]')
+    el, _ = solar_angles(lat, long, t, offset_gmt)  # sun elevation, degrees
+    sin_el = np.sin(el * np.pi / 180)
+    ghi_clear = _clear_sky(sin_el)  # clear-sky total horizontal irradiance, kW/m^2
+
+    # days and harmonics of the year and the day
+    day = (t.astype('datetime64[D]') - t[0].astype('datetime64[D]')).astype(np.int64)  # day index
+    n_days = day[-1] + 1
+    hour = (t - t.astype('datetime64[D]')).astype(np.int64) / 3.6e12  # clock hour
+    X_day = _annual_harmonics(np.arange(n_days))  # n_days x 5
+
+    # daily clear-sky index: seasonal mean and spread, standardized anomalies
+    kd = np.bincount(day, total_horizontal) / np.maximum(np.bincount(day, ghi_clear), 1e-9)
+    kd_mean = X_day @ np.linalg.lstsq(X_day, kd, rcond=None)[0]
+    kd_spread = np.sqrt(np.maximum(X_day @ np.linalg.lstsq(X_day, (kd - kd_mean) ** 2, rcond=None)[0], 1e-4))
+    u = (kd - kd_mean) / kd_spread  # cloud anomaly
+
+    # intraday deviations of the clear-sky index, where the sun is up
+    sunny = ghi_clear > 0.05
+    deviation = np.where(sunny, total_horizontal / np.maximum(ghi_clear, 1e-9) - kd[day], 0)
+    both = sunny[1:] & sunny[:-1]
+
+    # diffuse fraction by clearness index, in bins of 0.05
+    kt = _clearness(total_horizontal, sin_el)
+    kt_bin = np.minimum((kt[sunny] * 20).astype(int), 19)
+    count = np.bincount(kt_bin, minlength=20)
+    fraction = np.bincount(kt_bin, diffuse_horizontal[sunny] / total_horizontal[sunny], minlength=20)
+    kt_knots = (np.arange(20) + 0.5)[count > 0] / 20
+    fraction_knots = np.clip(fraction[count > 0] / count[count > 0], 0, 1)
+
+    # temperature: harmonics, cloud effects and AR(1) residuals
+    X_theta = _temperature_regressors(day, hour, u[day])
+    theta_coef = np.linalg.lstsq(X_theta, theta, rcond=None)[0]
+    residual = theta - X_theta @ theta_coef  # C
+    daily_residual = np.bincount(day, residual) / np.bincount(day)  # C
+    residual -= daily_residual[day]
+    theta_spread = np.sqrt(np.maximum(X_day @ np.linalg.lstsq(X_day, daily_residual ** 2, rcond=None)[0], 0.01))
+    daily_residual /= theta_spread  # standardized by season
+
+    return {
+        't_span': t,
+        'offset_gmt': offset_gmt,
+        'sin_el': sin_el,
+        'ghi_clear': ghi_clear,
+        'day': day,
+        'hour': hour,
+        'kd_mean': kd_mean,
+        'kd_spread': kd_spread,
+        'kd_max': kd.max(),
+        'u_sorted': np.sort(u),
+        'phi_day': _lag_one(u[:-1], u[1:]),
+        'phi_intraday': _lag_one(deviation[:-1][both], deviation[1:][both]),
+        'sigma_intraday': np.std(deviation[sunny]),
+        'k_max': np.quantile(total_horizontal[sunny] / ghi_clear[sunny], 0.999),
+        'kt_knots': kt_knots,
+        'fraction_knots': fraction_knots,
+        'theta_coef': theta_coef,
+        'phi_theta_day': _lag_one(daily_residual[:-1], daily_residual[1:]),
+        'theta_spread': theta_spread,
+        'phi_theta': _lag_one(residual[:-1], residual[1:]),
+        'sigma_theta': np.std(residual),
+    }
+
+
+def synthetic_weather(model, n_years, rng=None, dtype=float):
+    """
+    syntheticWeather draws synthetic weather years from a model fitted by
+    fitWeatherModel. All years are drawn at once: the AR(1) processes are
+    filtered along the time axis of n_years x K noise arrays.
+
+    Input:
+      model, the fitted weather model
+      n_years, the number of synthetic years
+      rng, (optional) a np.random.Generator
+      dtype, the floating-point type of the outputs (e.g. np.float32 to
+          halve the memory of many years)
+
+    Output (as import_weather, with one row per year):
+      temperature, the n_years x K outdoor temperature in C
+      total_horizontal, the n_years x K total horizontal irradiance in kW/m^2
+      beam_normal, the n_years x K beam normal irradiance in kW/m^2
+      diffuse_horizontal, the n_years x K diffuse horizontal irradiance in
+          kW/m^2
+      offset_gmt, the K x 1 (local time) - (Greenwich mean time) in hours
+    """
+    from scipy.signal import lfilter
+    from scipy.special import ndtr
+
+    rng = np.random.default_rng() if rng is None else rng
+    day, sin_el, ghi_clear = model['day'], model['sin_el'], model['ghi_clear']
+    K = len(day)
+    n_days = len(model['kd_mean'])
+
+    # daily clear-sky index: AR(1) anomalies, mapped to the observed ones
+    g = _ar1(lfilter, rng, model['phi_day'], 1.0, (n_years, n_days))
+    q = ndtr(g)  # uniform quantiles
+    u = np.interp(q, (np.arange(n_days) + 0.5) / n_days, model['u_sorted'])
+    kd = np.clip(model['kd_mean'] + model['kd_spread'] * u, 0, model['kd_max'])
+
+    # irradiance
+    k = kd[:, day] + _ar1(lfilter, rng, model['phi_intraday'], model['sigma_intraday'], (n_years, K))
+    total_horizontal = np.clip(k, 0, model['k_max']) * ghi_clear  # kW/m^2
+    fraction = np.interp(_clearness(total_horizontal, sin_el), model['kt_knots'], model['fraction_knots'])
+    diffuse_horizontal = fraction * total_horizontal  # kW/m^2
+    beam_normal = np.where(sin_el > 0.05, (total_horizontal - diffuse_horizontal) / np.maximum(sin_el, 0.05), 0)  # kW/m^2
+
+    # temperature, linear in the cloud anomaly: clear-mean + anomaly x gain
+    coef = model['theta_coef']
+    base = _temperature_regressors(day, model['hour'], np.zeros(K)) @ coef  # C
+    gain = _temperature_regressors(day, model['hour'], np.ones(K)) @ coef - base  # C
+    temperature = (base + u[:, day] * gain).astype(dtype, copy=False)
+    temperature += (model['theta_spread'] * _ar1(lfilter, rng, model['phi_theta_day'], 1.0, (n_years, n_days)))[:, day]
+    temperature += _ar1(lfilter, rng, model['phi_theta'], model['sigma_theta'], (n_years, K))
+
+    return (temperature, total_horizontal.astype(dtype, copy=False), beam_normal.astype(dtype, copy=False),
+            diffuse_horizontal.astype(dtype, copy=False), model['offset_gmt'])
+
+
+def _clear_sky(sin_el):
+    # Haurwitz clear-sky total horizontal irradiance, kW/m^2
+    return np.where(sin_el > 0, 1.098 * sin_el * np.exp(-0.057 / np.maximum(sin_el, 1e-3)), 0)
+
+
+def _clearness(total_horizontal, sin_el):
+    # clearness index: total over extraterrestrial horizontal irradiance
+    return np.clip(total_horizontal / (1.361 * np.maximum(sin_el, 0.05)), 0, 1)
+
+
+def _annual_harmonics(day):
+    # constant and two harmonics of the year
+    w = 2 * np.pi * day / 365.25
+    return np.column_stack((np.ones(len(day)), np.cos(w), np.sin(w), np.cos(2 * w), np.sin(2 * w)))
+
+
+def _temperature_regressors(day, hour, u):
+    # annual and daily harmonics, their products, and cloud effects on the
+    # mean and on the daily cycle
+    annual = _annual_harmonics(day)
+    h = 2 * np.pi * hour / 24
+    daily = np.column_stack((np.cos(h), np.sin(h), np.cos(2 * h), np.sin(2 * h)))
+    seasonal_daily = (annual[:, 1:3, None] * daily[:, None, :2]).reshape(len(day), 4)
+    return np.column_stack((annual, daily, seasonal_daily, u, u[:, None] * daily[:, :2]))
+
+
+def _lag_one(x, y):
+    # lag-one autocorrelation, kept below one for a stationary process
+    return float(np.clip(np.corrcoef(x, y)[0, 1], 0, 0.999))
+
+
+def _ar1(lfilter, rng, phi, sigma, shape):
+    # stationary AR(1) processes with standard deviation sigma along axis 1
+    e = rng.standard_normal(shape)
+    start = rng.standard_normal((shape[0], 1))
+    return sigma * lfilter([np.sqrt(1 - phi ** 2)], [1, -phi], e, axis=1, zi=phi * start)[0]
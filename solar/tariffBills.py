@@ -0,0 +1,145 @@
+import numpy as np
+
+
+def tou_periods(t_span, windows, weekdays_only=True):
+    """
+    touPeriods assigns each time step to a time-of-use period. Period 0 is
+    off-peak; period i is the i-th window of clock hours.
+
+    Input:
+      t_span, the K x 1 datetimes
+      windows, a list of (start hour, end hour) pairs, e.g. [(16, 21)] for a
+          4-9 pm peak period; later windows take precedence where they overlap
+      weekdays_only, an indicator of whether weekends are off-peak
+
+    Output:
+      periods, the K x 1 period indices
+    """
+    t = np.asarray(t_span, dtype='datetime64[ns]')
+    hour = (t - t.astype('datetime64[D]')).astype(np.int64) / 3.6e12  # clock hour
+    weekday = (t.astype('datetime64[D]').astype(np.int64) + 3) % 7 < 5  # 1970-01-01 was a Thursday
+    periods = np.zeros(len(t), dtype=np.intp)
+    for i, (start, end) in enumerate(windows):
+        in_window = (hour >= start) & (hour < end)
+        if weekdays_only:
+            in_window &= weekday
+        periods[in_window] = i + 1
+    return periods
+
+
+def tariff_bills(p, t_span, dt, periods=None, pi_buy=0.15, pi_sell=0.03, tier_limits=(), tier_prices=(0,),
+                 pi_demand=0, fixed_charge=0, block=None):
+    """
+    tariffBills computes monthly electricity bills under a tariff with
+    time-of-use (TOU) energy prices, monthly consumption tiers, export
+    credits and monthly peak-demand charges. At each time step, positive
+    net demand is bought and negative net demand is sold.
+
+    The time steps are sorted once by month and then by TOU period, so that
+    every (month, period) pair is a contiguous segment. Each block of
+    customers then needs one column gather and one np.add.reduceat (or
+    np.maximum.reduceat) per quantity to get all monthly energies and peaks
+    at once. Customers are processed in small blocks, so the temporaries
+    stay in cache and storage does not grow with n.
+
+    Input:
+      p, the n x K net electricity demand (demand minus solar supply), kW,
+          or a K x 1 vector for one customer
+      t_span, the K x 1 datetimes, in chronological order
+      dt, the time step, h
+      periods, (optional) the K x 1 TOU period indices (see touPeriods); all
+          zero if not given
+      pi_buy, the price of energy bought in each TOU period, $/kWh
+      pi_sell, the price of energy sold (export credit) in each TOU
+          period, $/kWh
+      tier_limits, the nT - 1 monthly energy bought at which each tier ends,
+          kWh (none for an untiered tariff)
+      tier_prices, the nT prices added to pi_buy for the monthly energy
+          bought in each tier, $/kWh
+      pi_demand, the demand charge on the monthly peak power bought, $/kW;
+          a scalar for the peak over all time steps, or one price per TOU
+          period for the peak within each period
+      fixed_charge, the fixed charge per month, $
+      block, (optional) the number of customers processed at once (default:
+          about 2^16 time steps' worth)
+
+    Output:
+      bill, the n x M monthly bills, $ (M x 1 for one customer)
+      energy, the n x M energy charges, including tiers, $
+      credit, the n x M export credits, $
+      demand, the n x M demand charges, $
+      months, the M x 1 months (datetime64[M])
+
+    Example (with p, t_span, dt and a finite p_sun from simulateSolar):
+    annual costs without and with solar under weekday 4-9 pm peak prices,
+    a second tier above 600 kWh per month and a $5/kW demand charge,
+      periods = tou_periods(t_span, [(16, 21)])  # 0 off-peak, 1 on-peak
+      bills = tariff_bills(np.vstack((p, p - p_sun)), t_span, dt, periods, pi_buy=[0.12, 0.30], pi_sell=0.03,
+                           tier_limits=[600], tier_prices=[0, 0.03], pi_demand=5)[0]  # $
+      c4, c5 = np.sum(bills, axis=1)  # $
+    """
+
+    # one row per customer
+    single = np.ndim(p) == 1
+    p = np.atleast_2d(p)
+    n, K = p.shape
+    t = np.asarray(t_span, dtype='datetime64[ns]')
+    periods = np.zeros(K, dtype=np.intp) if periods is None else np.asarray(periods, dtype=np.intp)
+    nP = max(periods.max() + 1, np.size(pi_buy), np.size(pi_sell), np.size(pi_demand))  # number of periods
+    pi_buy = np.broadcast_to(np.asarray(pi_buy, dtype=float), (nP,))
+    pi_sell = np.broadcast_to(np.asarray(pi_sell, dtype=float), (nP,))
+    per_period_demand = np.ndim(pi_demand) > 0
+    pi_demand = np.broadcast_to(np.asarray(pi_demand, dtype=float), (nP,))
+    tier_limits = np.asarray(tier_limits, dtype=float)
+    tier_prices = np.asarray(tier_prices, dtype=float)
+    tier_starts = np.concatenate(([0], tier_limits))  # kWh
+    tier_sizes = np.concatenate((tier_limits, [np.inf])) - tier_starts  # kWh
+
+    # columns sorted by (month, period), with one segment per pair
+    months, month = np.unique(t.astype('datetime64[M]'), return_inverse=True)
+    M = len(months)
+    segment = month * nP + periods  # index into the M x nP grid
+    order = np.argsort(segment, kind='stable')
+    segments, starts = np.unique(segment[order], return_index=True)
+    if block is None:
+        block = max(1, 2 ** 16 // K)
+
+    bill = np.empty((n, M))
+    energy = np.empty((n, M))
+    credit = np.empty((n, M))
+    demand = np.zeros((n, M))
+    for i in range(0, n, block):
+        b = min(block, n - i)
+        net = np.asarray(p[i:i + block], dtype=float)[:, order]
+        bought = np.maximum(net, 0)  # kW
+        sold = bought - net  # kW
+
+        # energy bought and sold per month and period, kWh
+        E = np.zeros((b, M * nP))
+        X = np.zeros((b, M * nP))
+        E[:, segments] = np.add.reduceat(bought, starts, axis=1) * dt
+        X[:, segments] = np.add.reduceat(sold, starts, axis=1) * dt
+        E = E.reshape(b, M, nP)
+        X = X.reshape(b, M, nP)
+
+        # TOU energy charges plus tier adders on the monthly total
+        total = E.sum(axis=2)  # kWh
+        in_tier = np.clip(total[:, :, None] - tier_starts, 0, tier_sizes)  # kWh
+        energy[i:i + b] = E @ pi_buy + in_tier @ tier_prices
+        credit[i:i + b] = X @ pi_sell
+
+        # demand charges on monthly peaks
+        if np.any(pi_demand != 0):
+            peak = np.zeros((b, M * nP))
+            peak[:, segments] = np.maximum.reduceat(bought, starts, axis=1)
+            peak = peak.reshape(b, M, nP)  # kW
+            if per_period_demand:
+                demand[i:i + b] = peak @ pi_demand
+            else:
+                demand[i:i + b] = peak.max(axis=2) * pi_demand[0]
+
+        bill[i:i + b] = energy[i:i + b] - credit[i:i + b] + demand[i:i + b] + fixed_charge
+
+    if single:
+        return bill[0], energy[0], credit[0], demand[0], months
+    return bill, energy, credit, demand, months
@@ -0,0 +1,250 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def discretize_1r1c(R, C, dt):
+    """
+    discretize1R1C computes the discrete-time dynamics parameter of a 1R1C
+    thermal circuit (or any first-order model with time constant R*C) under
+    a zero-order hold, a = exp(-dt/(R*C)). Results are memoized.
+
+    Input:
+      R, the thermal resistance, C/kW
+      C, the thermal capacitance, kWh/C
+      dt, the time step, h
+
+    Output:
+      a, the discrete-time dynamics parameter
+    """
+    return _first_order(float(R) * float(C), float(dt))
+
+
+def discretize_first_order(tau, dt):
+    """
+    discretizeFirstOrder computes the discrete-time dynamics parameter
+    a = exp(-dt/tau) of a first-order model with time constant tau, such as
+    a battery with self-dissipation. Results are memoized.
+
+    Input:
+      tau, the time constant, h
+      dt, the time step, h
+
+    Output:
+      a, the discrete-time dynamics parameter
+    """
+    return _first_order(float(tau), float(dt))
+
+
+def discretize_2r2c(R, C, Rm, Cm, dt):
+    """
+    discretize2R2C computes the exact zero-order-hold discretization of a
+    2R2C building model with state [indoor air temperature; thermal mass
+    temperature] and input (HVAC + exogenous) thermal power into the air.
+    Results are memoized, so repeated calls with the same parameters cost a
+    dictionary lookup.
+
+    Input:
+      R, the indoor-outdoor thermal resistance, C/kW
+      C, the air thermal capacitance, kWh/C
+      Rm, the indoor-mass thermal resistance, C/kW
+      Cm, the mass thermal capacitance, kWh/C
+      dt, the time step, h
+
+    Output:
+      A, the 2 x 2 discrete-time dynamics matrix (read-only)
+      B, the 2 x 1 discrete-time input matrix (read-only)
+    """
+    return _2r2c(float(R), float(C), float(Rm), float(Cm), float(dt))
+
+
+def discretize_2r2c_batch(R, C, Rm, Cm, dt):
+    """
+    discretize2R2CBatch computes the exact zero-order-hold discretization of
+    many 2R2C building models at once. The matrix exponential of each 2 x 2
+    system is evaluated in closed form from its two real eigenvalues
+    (Sylvester's formula), vectorized over all parameter sets.
+
+    Input:
+      R, C, Rm, Cm, dt, arrays (or scalars) of parameters that broadcast to
+          a common shape of N parameter sets, in the units of discretize_2r2c
+
+    Output:
+      A, the N x 2 x 2 discrete-time dynamics matrices
+      B, the N x 2 x 1 discrete-time input matrices
+    """
+
+    # broadcast parameters to N sets
+    R, C, Rm, Cm, dt = (np.ravel(x).astype(float) for x in np.broadcast_arrays(R, C, Rm, Cm, dt))
+
+    # continuous-time dynamics Ac = [[a, b], [c, d]], Bc = [1/C; 0]
+    a = -(1 / R + 1 / Rm) / C
+    b = 1 / (Rm * C)
+    c = 1 / (Rm * Cm)
+    d = -1 / (Rm * Cm)
+
+    # eigenvalues, real and distinct since b*c > 0
+    half_trace = (a + d) / 2
+    root = np.sqrt(((a - d) / 2) ** 2 + b * c)
+    l1 = half_trace + root
+    l2 = half_trace - root
+
+    # expm(Ac dt) = (exp(l1 dt) (Ac - l2 I) - exp(l2 dt) (Ac - l1 I)) / (l1 - l2)
+    e1 = np.exp(l1 * dt)
+    e2 = np.exp(l2 * dt)
+    g = (e1 - e2) / (l1 - l2)
+    h = (l1 * e2 - l2 * e1) / (l1 - l2)
+    A = np.empty((len(R), 2, 2))
+    A[:, 0, 0] = g * a + h
+    A[:, 0, 1] = g * b
+    A[:, 1, 0] = g * c
+    A[:, 1, 1] = g * d + h
+
+    # B = Ac^-1 (A - I) Bc, using Ac^-1 = [[d, -b], [-c, a]] / det(Ac)
+    det = a * d - b * c
+    B = np.empty((len(R), 2, 1))
+    B[:, 0, 0] = (d * (A[:, 0, 0] - 1) - b * A[:, 1, 0]) / (det * C)
+    B[:, 1, 0] = (-c * (A[:, 0, 0] - 1) + a * A[:, 1, 0]) / (det * C)
+
+    return A, B
+
+
+def first_order_response(x0, a, u, b=1.0):
+    """
+    firstOrderResponse computes the open-loop response of the first-order
+    recurrence
+
+        x[k+1] = a x[k] + b u[k]
+
+    shared by the storage models (batteries, tanks, 1R1C buildings), with
+    time along the first axis. It is evaluated by the closed-form prefix
+    scan
+
+        x[k] = a^k (x[0] + sum_{j<k} b u[j] a^-(j+1)),
+
+    a cumulative sum, in chunks short enough that a^k does not underflow.
+    Unlike scipy.signal.lfilter, the scan takes a different a for each
+    column (one per device), and it needs only numpy, whose import is much
+    cheaper than scipy.signal's for the short segments of simulateSegments.
+    A cumulative sum down the rows of a wide array is slow (strided), so
+    with more than 128 columns the rows are updated one step at a time
+    instead, which costs little per column.
+
+    Input:
+      x0, the initial states (scalar or matching u's trailing dimensions)
+      a, the discrete-time dynamics parameters, 0 < a <= 1 (scalar or per
+          column)
+      u, the K x ... inputs
+      b, the input gains (scalar or per column)
+
+    Output:
+      x, the K+1 x ... states
+    """
+
+    u = np.asarray(u, dtype=float)
+    K = u.shape[0]
+    shape = u.shape[1:]
+    a = np.asarray(a, dtype=float)
+    if a.ndim > 0 and np.ptp(a) == 0:
+        a = a.flat[0]  # one a for every column, so a^k is a vector
+    x = np.empty((K + 1,) + shape)
+    x[0] = x0
+    if K == 0:
+        return x
+
+    bu = b * u
+    if np.prod(shape, dtype=int) > 128:
+        for k in range(K):
+            np.multiply(a, x[k], out=x[k + 1])
+            x[k + 1] += bu[k]
+        return x
+
+    # prefix scan, restarted whenever a^k would fall below 1e-100
+    L = K if a.min() == 1 else max(1, int(-100 * np.log(10) / np.log(a.min())))  # chunk length
+    for k in range(0, K, L):
+        n = min(L, K - k)
+        P = a ** np.arange(1, n + 1).reshape((n,) + (1,) * len(shape))  # a^1 ... a^n
+        x[k + 1:k + n + 1] = P * (x[k] + np.cumsum(bu[k:k + n] / P, axis=0))
+    return x
+
+
+def simulate_segments(x0, a, u, free, control, b=1.0):
+    """
+    simulateSegments simulates the first-order recurrence
+
+        x[k+1] = a x[k] + b u[k]
+
+    under a controller that only acts at some time steps. Where free[k] is
+    true, u[k] is the given (open-loop) input, and each run of free steps
+    is evaluated at once by firstOrderResponse. At the other steps, the
+    input is chosen by control(k, x[k]) and the state advanced one step.
+    Only the controlled steps and one call per free run cost a Python
+    iteration, so e.g. the hours a vehicle is unplugged or a building is
+    outside its heating and cooling seasons are nearly free.
+
+    Input:
+      x0, the initial states (scalar or matching u's trailing dimensions)
+      a, the discrete-time dynamics parameters (scalar or per column)
+      u, the K x ... inputs at the free steps (other entries are ignored)
+      free, the K x 1 indicators of open-loop steps
+      control, a function (k, x[k]) -> u[k] called at the other steps, in
+          order of k
+      b, the input gains (scalar or per column)
+
+    Output:
+      x, the K+1 x ... states
+      u, the K x ... inputs, including the controlled ones
+    """
+
+    u = np.array(u, dtype=float)  # copy, filled in at controlled steps
+    K = u.shape[0]
+    x = np.empty((K + 1,) + u.shape[1:])
+    x[0] = x0
+
+    # runs of free steps, [start, stop)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], np.asarray(free, dtype=np.int8), [0]))))
+    k = 0
+    for start, stop in zip(np.append(edges[::2], K), np.append(edges[1::2], K)):
+        for k in range(k, start):
+            u[k] = control(k, x[k])
+            x[k + 1] = a * x[k] + b * u[k]
+        if stop > start:
+            x[start:stop + 1] = first_order_response(x[start], a, u[start:stop], b)
+        k = stop
+    return x, u
+
+
+def discretization_cache_info():
+    """
+    discretizationCacheInfo reports the hit/miss statistics of the memoized
+    discretizations.
+
+    Output:
+      info, a dict mapping each cache ('first_order', '2r2c') to a dict
+          with hits, misses, size and max_size
+    """
+    return {name: dict(zip(('hits', 'misses', 'max_size', 'size'), cache.cache_info()))
+            for name, cache in (('first_order', _first_order), ('2r2c', _2r2c))}
+
+
+def discretization_cache_clear():
+    """
+    discretizationCacheClear empties the memoized discretizations and
+    resets their statistics.
+    """
+    _first_order.cache_clear()
+    _2r2c.cache_clear()
+
+
+@lru_cache(maxsize=65536)
+def _first_order(tau, dt):
+    return float(np.exp(-dt / tau))
+
+
+@lru_cache(maxsize=65536)
+def _2r2c(R, C, Rm, Cm, dt):
+    A, B = discretize_2r2c_batch(R, C, Rm, Cm, dt)
+    A, B = A[0], B[0]
+    A.setflags(write=False)  # shared between callers
+    B.setflags(write=False)
+    return A, B
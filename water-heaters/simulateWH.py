@@ -17,24 +17,30 @@ Please make sure the following functions are available:
 # Required imports
 # ==============================================================================
 
-import matplotlib.pyplot as plt
+import sys
 import numpy as np
 from getWaterHeaterParameters import get_water_heater_parameters
 from generateWaterDraws import generate_water_draws
-from plotResults import plot_results
 from waterHeaterControl import water_heater_control
+from discretizeRC import discretize_1r1c
 
 # ==============================================================================
 # Graphics settings
 # ==============================================================================
+# run with --no-plot to simulate without graphics (e.g. in batch jobs)
+to_plot = '--no-plot' not in sys.argv  # indicator of whether to plot results
 
-plt.rc('font', size=20)
-plt.rc('axes', titlesize=24, labelsize=18)
-plt.rc('xtick', labelsize=16)
-plt.rc('ytick', labelsize=16)
-plt.rc('legend', fontsize=12)
-plt.rc('figure', titlesize=20)
-plt.rc('lines', linewidth=3)
+if to_plot:
+    import matplotlib.pyplot as plt
+    from plotResults import plot_results
+
+    plt.rc('font', size=20)
+    plt.rc('axes', titlesize=24, labelsize=18)
+    plt.rc('xtick', labelsize=16)
+    plt.rc('ytick', labelsize=16)
+    plt.rc('legend', fontsize=12)
+    plt.rc('figure', titlesize=20)
+    plt.rc('lines', linewidth=3)
 
 ### input data
 # Water heater parameters
@@ -60,7 +66,7 @@ xMin = 0  # Minimum thermal energy, kWh
 xMax = C * (Th - Tc)  # Maximum thermal energy, kWh
 x0 = xMax  # Initial state, kWh
 alpha = 1 / (R * C)  # Continuous-time dynamics parameter, 1/h
-a = np.exp(-alpha * dt)  # Discrete-time dynamics parameter
+a = discretize_1r1c(R, C, dt)  # Discrete-time dynamics parameter
 Ta = 20  # Ambient air temperature, Celsius
 w = (Ta - Tc) / R - qd  # Disturbance, kW
 
@@ -73,7 +79,8 @@ eta = 3 * np.ones(K)  # Heat pump coefficient of performance
 # simulation
 x1, p1 = water_heater_control(x0, xMax, phMax, prMax, a, w, eta, alpha, xr)
 # plots
-plot_results(t, x1, p1, qd, xMin, xMax, phMax, prMax, xr, 1)
+if to_plot:
+    plot_results(t, x1, p1, qd, xMin, xMax, phMax, prMax, xr, 1)
 
 ### Heat-pump-only simulation
 # parameters
@@ -83,7 +90,8 @@ xr = 0  # Energy threshold for resistor turn-on in hybrid case, kWh
 # simulation
 x2, p2 = water_heater_control(x0, xMax, phMax, prMax, a, w, eta, alpha, xr)
 # plots
-plot_results(t, x2, p2, qd, xMin, xMax, phMax, prMax, xr, 2)
+if to_plot:
+    plot_results(t, x2, p2, qd, xMin, xMax, phMax, prMax, xr, 2)
 
 ### Hybrid simulation
 # parameters
@@ -93,4 +101,5 @@ xr = 0.5 * (xMax - xMin)  # Energy threshold for resistor turn-on in hybrid case
 # simulation
 x3, p3 = water_heater_control(x0, xMax, phMax, prMax, a, w, eta, alpha, xr)
 # plots
-plot_results(t, x3, p3, qd, xMin, xMax, phMax, prMax, xr, 3)
\ No newline at end of file
+if to_plot:
+    plot_results(t, x3, p3, qd, xMin, xMax, phMax, prMax, xr, 3)
\ No newline at end of file